@@ -1,6 +1,8 @@
 import discord
-from discord.ext import commands
-import requests
+from discord import app_commands
+from discord.ext import commands, tasks
+import aiohttp
+from aiohttp import web
 import json
 from datetime import datetime, timedelta, timezone
 import asyncio
@@ -8,11 +10,38 @@ import re
 import io
 import os
 import time
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator, Iterable, BinaryIO, Literal, Callable, Awaitable, Hashable, TypeVar
 import sys
+import bisect
+import codecs
+import contextlib
+import csv
+import sqlite3
+import threading
+import random
+import hashlib
+from email.utils import parsedate_to_datetime
+import gzip
+import shutil
+import tempfile
+from collections import OrderedDict, defaultdict, Counter
+import operator
+import functools
+import inspect
+import contextvars
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    from matplotlib.figure import Figure
+except ImportError:
+    Figure = None
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
-json_path = os.path.join(script_dir, 'data.json')
+json_path = os.environ.get("AUTHGUARD_BOT_CONFIG", os.path.join(script_dir, 'data.json'))
 
 try:
     with open(json_path, 'r') as f:
@@ -24,20 +53,180 @@ except json.JSONDecodeError:
     print("Error: data.json contains invalid JSON.")
     sys.exit()
 
-AUTHGUARD_API_URL = "https://api.authguard.org"
+AUTHGUARD_API_URL: str = config.get("API_URL", "https://api.authguard.org")
 API_TOKEN: str = config.get("API_TOKEN")
 SERVICE_ID: int = config.get("SERVICE_ID")
 CRAVEX_PROMO_LINK: str = config.get("PROMO_LINK")
 BOT_TOKEN: str = config.get("BOT_TOKEN")
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S UTC"
+REQUEST_TIMEOUT: float = config.get("REQUEST_TIMEOUT", 10)
+HTTP_POOL_SIZE: int = config.get("HTTP_POOL_SIZE", 20)
+API_RATE_LIMIT: float = config.get("API_RATE_LIMIT", 10)
+API_RATE_BURST: int = config.get("API_RATE_BURST", 10)
+API_MIN_RATE: float = config.get("API_MIN_RATE", 1)
+API_MAX_RETRIES: int = config.get("API_MAX_RETRIES", 3)
+LOOKUP_CONCURRENCY: int = config.get("LOOKUP_CONCURRENCY", 8)
+KEY_ROUTE_CACHE_SIZE: int = config.get("KEY_ROUTE_CACHE_SIZE", 10000)
+METRICS_HOST: str = config.get("METRICS_HOST", "127.0.0.1")
+METRICS_PORT: int = config.get("METRICS_PORT", 9108)
+KEY_INDEX_MAX_AGE: float = config.get("KEY_INDEX_MAX_AGE", 300)
+KEY_INDEX_REFRESH_INTERVAL: float = config.get("KEY_INDEX_REFRESH_INTERVAL", 120)
+SYNC_PAGE_SIZE: int = config.get("SYNC_PAGE_SIZE", 1000)
+SYNC_SINCE_PARAM: str = config.get("SYNC_SINCE_PARAM", "")
+SYNC_FULL_EVERY: int = config.get("SYNC_FULL_EVERY", 10)
+EXPORT_SPOOL_SIZE: int = config.get("EXPORT_SPOOL_SIZE", 4 * 1024 * 1024)
+KEY_CACHE_TTL: float = config.get("KEY_CACHE_TTL", 300)
+BLACKLIST_REFRESH_INTERVAL: float = config.get("BLACKLIST_REFRESH_INTERVAL", 300)
+EXPIRY_SCAN_INTERVAL: float = config.get("EXPIRY_SCAN_INTERVAL", 60)
+EXPIRY_WARNING_WINDOW: float = config.get("EXPIRY_WARNING_WINDOW", 86400)
+EXPIRY_CHANNEL_ID: int = config.get("EXPIRY_CHANNEL_ID", 0)
+EXPIRY_DM_OWNERS: bool = config.get("EXPIRY_DM_OWNERS", False)
+KEY_CACHE_PATH: str = os.path.join(script_dir, config.get("KEY_CACHE_PATH", "cache.db"))
+BULK_CONCURRENCY: int = config.get("BULK_CONCURRENCY", 8)
+BULK_CREATE_MAX: int = config.get("BULK_CREATE_MAX", 500)
+BULK_OPERATION_MAX: int = config.get("BULK_OPERATION_MAX", 1000)
+BULK_PROGRESS_INTERVAL: float = config.get("BULK_PROGRESS_INTERVAL", 2)
+SHARDED: bool = config.get("SHARDED", False)
+SHARD_COUNT: Optional[int] = config.get("SHARD_COUNT")
+SHARD_IDS: Optional[List[int]] = config.get("SHARD_IDS")
+JOB_QUEUE_PATH: str = os.path.join(script_dir, config.get("JOB_QUEUE_PATH", "jobs.db"))
+JOB_WORKERS: int = config.get("JOB_WORKERS", 2)
+JOB_BATCH_SIZE: int = config.get("JOB_BATCH_SIZE", 50)
+JOB_LEASE_SECONDS: float = config.get("JOB_LEASE_SECONDS", 60)
+KEY_STATS_DAYS: int = config.get("KEY_STATS_DAYS", 14)
+AUDIT_LOG_PATH: str = os.path.join(script_dir, config.get("AUDIT_LOG_PATH", "audit.db"))
+AUDIT_JSONL_PATH: str = os.path.join(script_dir, config["AUDIT_JSONL_PATH"]) if config.get("AUDIT_JSONL_PATH") else ""
+AUDIT_CHANNEL_ID: int = config.get("AUDIT_CHANNEL_ID", 0)
+AUDIT_FLUSH_INTERVAL: float = config.get("AUDIT_FLUSH_INTERVAL", 2)
+AUDIT_LIST_LIMIT = 25
+OPERATION_STEP_RETRIES: int = config.get("OPERATION_STEP_RETRIES", 2)
+OPERATION_RETENTION: float = config.get("OPERATION_RETENTION", 86400)
+JOB_LIST_LIMIT = 10
+JOB_STATE_LABELS = {"queued": "⏳ Queued", "running": "🔄 Running", "done": "✅ Done", "failed": "❌ Failed"}
+DEV_GUILD_ID: int = config.get("DEV_GUILD_ID", 0)
+COMMAND_SYNC_PATH: str = os.path.join(script_dir, config.get("COMMAND_SYNC_PATH", "command_sync.json"))
+RATE_LIMIT_PATH: str = os.path.join(script_dir, config["RATE_LIMIT_PATH"]) if config.get("RATE_LIMIT_PATH") else ""
+EXPORT_CHUNK_SIZE = 500
+EXPORT_FIELDS = ["key", "id", "createdAt", "expiredAt", "hwid", "ip", "discordId", "isBlacklisted"]
 
 if not all([API_TOKEN, SERVICE_ID, CRAVEX_PROMO_LINK, BOT_TOKEN]):
     print("Error: Missing one or more required configuration values in data.json.")
     exit()
 
+if SHARD_IDS is not None and not SHARD_COUNT:
+    print("Error: SHARD_IDS needs SHARD_COUNT to be set in data.json.")
+    exit()
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+class Metrics:
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self):
+        self.descriptions: Dict[str, Tuple[str, str]] = {}
+        self.values: Dict[str, Dict[LabelSet, float]] = defaultdict(lambda: defaultdict(float))
+        self.histograms: Dict[str, Dict[LabelSet, List[float]]] = defaultdict(dict)
+
+    def describe(self, name: str, metric_type: str, description: str) -> None:
+        self.descriptions[name] = (metric_type, description)
+
+    def inc(self, name: str, labels: Optional[Dict[str, str]] = None, value: float = 1) -> None:
+        self.values[name][tuple(sorted((labels or {}).items()))] += value
+
+    def set(self, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        self.values[name][tuple(sorted((labels or {}).items()))] = value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        series = self.histograms[name].setdefault(tuple(sorted((labels or {}).items())), [0.0] * (len(self.BUCKETS) + 2))
+        for index, bound in enumerate(self.BUCKETS):
+            if value <= bound:
+                series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    @staticmethod
+    def format_labels(labels: LabelSet, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(labels) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name in sorted(set(self.values) | set(self.histograms)):
+            metric_type, description = self.descriptions.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in self.values.get(name, {}).items():
+                lines.append(f"{name}{self.format_labels(labels)} {value}")
+            for labels, series in self.histograms.get(name, {}).items():
+                for bound, count in zip(self.BUCKETS, series):
+                    lines.append(f"{name}_bucket{self.format_labels(labels, ('le', str(bound)))} {count}")
+                lines.append(f"{name}_bucket{self.format_labels(labels, ('le', '+Inf'))} {series[-1]}")
+                lines.append(f"{name}_sum{self.format_labels(labels)} {series[-2]}")
+                lines.append(f"{name}_count{self.format_labels(labels)} {series[-1]}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+metrics.describe("discord_command_duration_seconds", "histogram", "Time from receiving a slash command to its handler finishing.")
+metrics.describe("discord_commands_total", "counter", "Slash commands handled, by outcome.")
+metrics.describe("authguard_request_duration_seconds", "histogram", "AuthGuard API request latency per endpoint.")
+metrics.describe("authguard_requests_total", "counter", "AuthGuard API requests, by endpoint and HTTP status class.")
+metrics.describe("discord_shard_latency_seconds", "gauge", "Gateway heartbeat latency per shard run by this process.")
+metrics.describe("event_loop_lag_seconds", "gauge", "How late the last event loop probe woke up.")
+metrics.describe("discord_response_duration_seconds", "histogram", "Time from receiving a slash command to its reply being sent.")
+metrics.describe("job_queue_depth", "gauge", "Background jobs waiting for a worker.")
+metrics.describe("jobs_total", "counter", "Background jobs finished, by kind and final state.")
+metrics.describe("cache_lookups_total", "counter", "Local cache and index lookups, by cache and hit or miss.")
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    metrics.inc("cache_lookups_total", {"cache": cache, "result": "hit" if hit else "miss"})
+
+API_ROUTES = ("/key-manager/default-key", "/key-manager/premium-key", "/key-manager/blacklist")
+API_ROUTE_LABELS = (
+    ("/key-manager/service/", "/key-manager/service/{id}/key/{id}"),
+    *((f"{route}/", f"{route}/{{id}}") for route in API_ROUTES)
+)
+
+def endpoint_label(path: str) -> str:
+    if path in API_ROUTES:
+        return path
+    for prefix, label in API_ROUTE_LABELS:
+        if path.startswith(prefix):
+            return label
+    return "other"
+
+audit_actor: "contextvars.ContextVar[Optional[int]]" = contextvars.ContextVar("audit_actor", default=None)
+operation_scope: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("operation_scope", default=None)
+
+class InstrumentedCommandTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras["started_at"] = time.perf_counter()
+        audit_actor.set(interaction.user.id)
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError) -> None:
+        record_command(interaction, interaction.command, "error")
+        await super().on_error(interaction, error)
+
+def record_command(interaction: discord.Interaction, command: Any, outcome: str) -> None:
+    name = command.qualified_name if command is not None else "unknown"
+    started_at = interaction.extras.get("started_at")
+    if started_at is not None:
+        metrics.observe("discord_command_duration_seconds", time.perf_counter() - started_at, {"command": name})
+    metrics.inc("discord_commands_total", {"command": name, "outcome": outcome})
+
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix='!', intents=intents)
+if SHARDED:
+    bot = commands.AutoShardedBot(command_prefix='!', intents=intents, tree_cls=InstrumentedCommandTree,
+                                  shard_count=SHARD_COUNT, shard_ids=SHARD_IDS)
+else:
+    bot = commands.Bot(command_prefix='!', intents=intents, tree_cls=InstrumentedCommandTree)
+
+def is_primary_process() -> bool:
+    return not SHARDED or SHARD_IDS is None or 0 in SHARD_IDS
 
 def get_auth_headers() -> Dict[str, str]:
     return {
@@ -48,6 +237,267 @@ def get_auth_headers() -> Dict[str, str]:
         "Referer": "https://authguard.org/"
     }
 
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class AdaptiveRateLimiter(TokenBucket):
+    def __init__(self, rate: float, capacity: float, min_rate: float = 1):
+        super().__init__(rate, capacity)
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.blocked_until = 0.0
+
+    async def acquire(self) -> None:
+        while True:
+            delay = self.blocked_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await super().acquire()
+            if time.monotonic() >= self.blocked_until:
+                return
+
+    def on_success(self) -> None:
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 50)
+
+    def on_throttled(self, retry_after: Optional[float]) -> None:
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+class SharedRateLimiter(AdaptiveRateLimiter):
+    def __init__(self, path: str, rate: float, capacity: float, min_rate: float = 1, name: str = "authguard"):
+        super().__init__(rate, capacity, min_rate)
+        self.name = name
+        self.pending_successes = 0
+        self.pending_throttle: Optional[float] = None
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=10)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit ("
+            "name TEXT PRIMARY KEY, tokens REAL NOT NULL, rate REAL NOT NULL, updated_at REAL NOT NULL, blocked_until REAL NOT NULL)"
+        )
+        self.connection.execute("INSERT OR IGNORE INTO rate_limit VALUES (?, ?, ?, ?, 0)", (name, capacity, rate, time.time()))
+        self.connection.execute("PRAGMA busy_timeout = 0")
+
+    @staticmethod
+    def lock_delay() -> float:
+        return random.uniform(0.005, 0.02)
+
+    def take(self) -> float:
+        now = time.time()
+        try:
+            self.connection.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError:
+            return self.lock_delay()
+        try:
+            tokens, rate, updated_at, blocked_until = self.connection.execute(
+                "SELECT tokens, rate, updated_at, blocked_until FROM rate_limit WHERE name = ?", (self.name,)
+            ).fetchone()
+            tokens = min(self.capacity, tokens + max(0.0, now - updated_at) * rate)
+            if self.pending_throttle is not None:
+                rate = max(self.min_rate, rate / 2)
+                tokens = 0.0
+                blocked_until = max(blocked_until, self.pending_throttle)
+            elif self.pending_successes:
+                rate = min(self.max_rate, rate + self.pending_successes * self.max_rate / 50)
+            if blocked_until > now:
+                delay = blocked_until - now
+            else:
+                delay = 0.0 if tokens >= 1 else (1 - tokens) / rate
+                if not delay:
+                    tokens -= 1
+            self.connection.execute("UPDATE rate_limit SET tokens = ?, rate = ?, updated_at = ?, blocked_until = ? WHERE name = ?",
+                                    (tokens, rate, now, blocked_until, self.name))
+            self.connection.execute("COMMIT")
+        except sqlite3.OperationalError:
+            if self.connection.in_transaction:
+                self.connection.execute("ROLLBACK")
+            return self.lock_delay()
+        except BaseException:
+            if self.connection.in_transaction:
+                self.connection.execute("ROLLBACK")
+            raise
+        self.pending_successes = 0
+        self.pending_throttle = None
+        self.rate = rate
+        return delay
+
+    async def acquire(self) -> None:
+        while True:
+            delay = self.blocked_until - time.monotonic()
+            if delay <= 0:
+                delay = self.take()
+                if delay <= 0:
+                    return
+            await asyncio.sleep(delay)
+
+    def on_success(self) -> None:
+        if self.rate < self.max_rate:
+            self.pending_successes += 1
+
+    def on_throttled(self, retry_after: Optional[float]) -> None:
+        self.pending_throttle = max(self.pending_throttle or 0.0, time.time() + (retry_after or 0.0))
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+class AuthGuardClient:
+    def __init__(self, base_url: str, timeout: float = 10, pool_size: int = 20,
+                 limiter: Optional[AdaptiveRateLimiter] = None, max_retries: int = 3):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.pool_size = pool_size
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, headers=get_auth_headers(), timeout=self.timeout)
+        return self._session
+
+    @staticmethod
+    def backoff(attempt: int) -> float:
+        return random.uniform(0, min(30.0, 0.5 * 2 ** attempt))
+
+    async def send(self, method: str, path: str, options: Dict[str, Any]) -> Tuple[int, Dict[str, Any], Optional[float]]:
+        labels = {"method": method, "endpoint": endpoint_label(path)}
+        started_at = time.perf_counter()
+        status_class = "error"
+        try:
+            async with self.get_session().request(method, f"{self.base_url}{path}", **options) as response:
+                status_class = f"{response.status // 100}xx"
+                try:
+                    data = await response.json(content_type=None)
+                except (json.JSONDecodeError, aiohttp.ContentTypeError):
+                    data = None
+                return response.status, data if isinstance(data, dict) else {}, parse_retry_after(response.headers.get("Retry-After"))
+        finally:
+            metrics.observe("authguard_request_duration_seconds", time.perf_counter() - started_at, labels)
+            metrics.inc("authguard_requests_total", {**labels, "status_class": status_class})
+
+    @contextlib.asynccontextmanager
+    async def stream(self, path: str, *, params: Optional[Dict[str, Any]] = None,
+                     headers: Optional[Dict[str, str]] = None) -> AsyncIterator[aiohttp.ClientResponse]:
+        labels = {"method": "GET", "endpoint": endpoint_label(path)}
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout.total, sock_read=self.timeout.total)
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            if self.limiter is not None:
+                await self.limiter.acquire()
+            started_at = time.perf_counter()
+            try:
+                response = await self.get_session().get(f"{self.base_url}{path}", params=params, headers=headers, timeout=timeout)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                metrics.inc("authguard_requests_total", {**labels, "status_class": "error"})
+                if last_attempt:
+                    raise
+                await asyncio.sleep(self.backoff(attempt))
+                continue
+            metrics.observe("authguard_request_duration_seconds", time.perf_counter() - started_at, labels)
+            metrics.inc("authguard_requests_total", {**labels, "status_class": f"{response.status // 100}xx"})
+            if not last_attempt and (response.status == 429 or response.status >= 500):
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                response.release()
+                if response.status == 429 and self.limiter is not None:
+                    self.limiter.on_throttled(retry_after)
+                await asyncio.sleep(retry_after if response.status == 429 and retry_after is not None else self.backoff(attempt))
+                continue
+            if self.limiter is not None and response.status < 400:
+                self.limiter.on_success()
+            try:
+                yield response
+            finally:
+                response.release()
+            return
+
+    async def request(self, method: str, path: str, *, params: Optional[Dict[str, Any]] = None,
+                      json_body: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Tuple[int, Dict[str, Any]]:
+        options: Dict[str, Any] = {"params": params, "json": json_body}
+        if timeout is not None:
+            options["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        retryable = method.upper() in IDEMPOTENT_METHODS
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            if self.limiter is not None:
+                await self.limiter.acquire()
+            try:
+                status, data, retry_after = await self.send(method, path, options)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if not retryable or last_attempt:
+                    raise
+                await asyncio.sleep(self.backoff(attempt))
+                continue
+            if status == 429:
+                if self.limiter is not None:
+                    self.limiter.on_throttled(retry_after)
+                if not last_attempt:
+                    await asyncio.sleep(retry_after if retry_after is not None else self.backoff(attempt))
+                    continue
+            elif status >= 500 and retryable and not last_attempt:
+                await asyncio.sleep(self.backoff(attempt))
+                continue
+            elif self.limiter is not None and status < 400:
+                self.limiter.on_success()
+            return status, data
+        return status, data
+
+    async def get(self, path: str, **kwargs) -> Tuple[int, Dict[str, Any]]:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> Tuple[int, Dict[str, Any]]:
+        return await self.request("POST", path, **kwargs)
+
+    async def patch(self, path: str, **kwargs) -> Tuple[int, Dict[str, Any]]:
+        return await self.request("PATCH", path, **kwargs)
+
+    async def delete(self, path: str, **kwargs) -> Tuple[int, Dict[str, Any]]:
+        return await self.request("DELETE", path, **kwargs)
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+if RATE_LIMIT_PATH:
+    api_limiter: AdaptiveRateLimiter = SharedRateLimiter(RATE_LIMIT_PATH, API_RATE_LIMIT, API_RATE_BURST, API_MIN_RATE)
+else:
+    api_limiter = AdaptiveRateLimiter(API_RATE_LIMIT, API_RATE_BURST, API_MIN_RATE)
+
+api = AuthGuardClient(AUTHGUARD_API_URL, timeout=REQUEST_TIMEOUT, pool_size=HTTP_POOL_SIZE,
+                      limiter=api_limiter, max_retries=API_MAX_RETRIES)
+
 def parse_duration(duration_str: str) -> Optional[int]:
     match = re.match(r'^(\d+)([dhm])$', duration_str.lower().strip())
     if not match:
@@ -63,205 +513,1221 @@ def parse_duration(duration_str: str) -> Optional[int]:
         return value * 60
     return None
 
-def get_key_details(key_id: str) -> Optional[Dict[str, Any]]:
-    endpoints = [
-        f"{AUTHGUARD_API_URL}/key-manager/premium-key/{key_id}",
-        f"{AUTHGUARD_API_URL}/key-manager/default-key/{key_id}",
-        f"{AUTHGUARD_API_URL}/key-manager/service/{SERVICE_ID}/key/{key_id}"
-    ]
-    for url in endpoints:
+KEY_ENDPOINTS: Dict[str, str] = {
+    "premium": "/key-manager/premium-key/{key_id}",
+    "default": "/key-manager/default-key/{key_id}",
+    "service": "/key-manager/service/{service_id}/key/{key_id}"
+}
+
+class KeyRouteCache:
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.hits: Dict[str, int] = {family: 0 for family in KEY_ENDPOINTS}
+        self._routes: "OrderedDict[str, str]" = OrderedDict()
+
+    def get(self, key_id: str) -> Optional[str]:
+        family = self._routes.get(key_id)
+        record_cache_lookup("key_route", family is not None)
+        if family is not None:
+            self._routes.move_to_end(key_id)
+        return family
+
+    def record(self, key_id: str, family: str) -> None:
+        self._routes[key_id] = family
+        self._routes.move_to_end(key_id)
+        self.hits[family] += 1
+        while len(self._routes) > self.max_size:
+            self._routes.popitem(last=False)
+
+    def forget(self, key_id: str) -> None:
+        self._routes.pop(key_id, None)
+
+    def order(self, key_id: str) -> List[str]:
+        families = sorted(KEY_ENDPOINTS, key=lambda family: -self.hits[family])
+        cached = self.get(key_id)
+        if cached is not None:
+            families.remove(cached)
+            families.insert(0, cached)
+        return families
+
+key_routes = KeyRouteCache(KEY_ROUTE_CACHE_SIZE)
+
+class KeyCache:
+    def __init__(self, path: str, ttl: float = 300):
+        self.ttl = ttl
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS key_cache ("
+            "kind TEXT NOT NULL, key_id TEXT NOT NULL, data TEXT NOT NULL, expires_at REAL NOT NULL, "
+            "PRIMARY KEY (kind, key_id))"
+        )
+        self.connection.execute("PRAGMA busy_timeout = 0")
+        self.stale: set = set()
+
+    def get(self, kind: str, key_id: str) -> Optional[Dict[str, Any]]:
+        row = None
+        if key_id not in self.stale:
+            try:
+                row = self.connection.execute(
+                    "SELECT data FROM key_cache WHERE kind = ? AND key_id = ? AND expires_at > ?", (kind, key_id, time.time())
+                ).fetchone()
+            except sqlite3.Error:
+                row = None
+        record_cache_lookup("key_cache", row is not None)
+        return json.loads(row[0]) if row else None
+
+    def set(self, kind: str, key_id: str, data: Dict[str, Any]) -> None:
+        if self.ttl <= 0 or key_id in self.stale:
+            return
         try:
-            response = requests.get(url, headers=get_auth_headers(), timeout=10)
-            if response.status_code == 200:
-                data = response.json()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO key_cache (kind, key_id, data, expires_at) VALUES (?, ?, ?, ?)",
+                (kind, key_id, json.dumps(data), time.time() + self.ttl)
+            )
+        except sqlite3.Error:
+            pass
+
+    def invalidate(self, key_id: str) -> None:
+        self.stale.add(key_id)
+        self.flush_stale()
+
+    def flush_stale(self) -> None:
+        try:
+            self.connection.executemany("DELETE FROM key_cache WHERE key_id = ?", [(key_id,) for key_id in self.stale])
+            self.stale.clear()
+        except sqlite3.Error:
+            pass
+
+    def purge_expired(self) -> None:
+        self.flush_stale()
+        try:
+            self.connection.execute("DELETE FROM key_cache WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error:
+            pass
+
+key_cache = KeyCache(KEY_CACHE_PATH, KEY_CACHE_TTL)
+
+T = TypeVar("T")
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        record_cache_lookup("single_flight", future is not None)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: "asyncio.Future[Any]") -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            future.exception()
+
+single_flight = SingleFlight()
+
+metrics.describe("audit_events_total", "counter", "Key changes recorded in the audit log, by action and outcome.")
+metrics.describe("audit_flush_duration_seconds", "histogram", "Time spent writing one batch of audit events.")
+
+class AuditLog:
+    def __init__(self, path: str, jsonl_path: str = ""):
+        self.jsonl_path = jsonl_path
+        self.pending: List[Dict[str, Any]] = []
+        self.lock = asyncio.Lock()
+        self.writer = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.writer.execute("PRAGMA journal_mode=WAL")
+        self.writer.execute("PRAGMA synchronous=NORMAL")
+        self.writer.execute(
+            "CREATE TABLE IF NOT EXISTS audit ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, created_at REAL NOT NULL, user_id INTEGER, action TEXT NOT NULL, "
+            "key_id TEXT, success INTEGER NOT NULL, reason TEXT, details TEXT NOT NULL)"
+        )
+        self.writer.execute("CREATE INDEX IF NOT EXISTS audit_key ON audit (key_id, created_at)")
+        self.writer.execute("CREATE INDEX IF NOT EXISTS audit_user ON audit (user_id, created_at)")
+        self.writer.execute("CREATE INDEX IF NOT EXISTS audit_time ON audit (created_at)")
+        self.reader = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.reader.row_factory = sqlite3.Row
+
+    def record(self, action: str, key_id: Optional[str], success: bool, reason: Optional[str] = None,
+               details: Optional[Dict[str, Any]] = None) -> None:
+        self.pending.append({"created_at": time.time(), "user_id": audit_actor.get(), "action": action, "key_id": key_id,
+                             "success": bool(success), "reason": reason, "details": details or {}})
+        metrics.inc("audit_events_total", {"action": action, "outcome": "success" if success else "failure"})
+
+    def write(self, events: List[Dict[str, Any]]) -> None:
+        with self.writer:
+            self.writer.execute("BEGIN")
+            self.writer.executemany(
+                "INSERT INTO audit (created_at, user_id, action, key_id, success, reason, details) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(event["created_at"], event["user_id"], event["action"], event["key_id"], int(event["success"]),
+                  event["reason"], json.dumps(event["details"], default=str)) for event in events]
+            )
+        if self.jsonl_path:
+            with contextlib.suppress(OSError), open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(event, default=str) + "\n" for event in events)
+
+    async def flush(self) -> List[Dict[str, Any]]:
+        async with self.lock:
+            events, self.pending = self.pending, []
+            if events:
+                started_at = time.perf_counter()
+                try:
+                    await asyncio.to_thread(self.write, events)
+                except sqlite3.Error:
+                    self.pending[:0] = events
+                    return []
+                metrics.observe("audit_flush_duration_seconds", time.perf_counter() - started_at)
+            return events
+
+    def query(self, key_id: Optional[str] = None, user_id: Optional[int] = None, since: Optional[float] = None,
+              limit: int = AUDIT_LIST_LIMIT, until: Optional[float] = None) -> List[Dict[str, Any]]:
+        clauses: List[str] = []
+        values: List[Any] = []
+        for clause, value in (("key_id = ?", key_id), ("user_id = ?", user_id), ("created_at >= ?", since), ("created_at < ?", until)):
+            if value is not None:
+                clauses.append(clause)
+                values.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.reader.execute(f"SELECT * FROM audit{where} ORDER BY created_at DESC LIMIT ?", (*values, limit)).fetchall()
+        return [{**dict(row), "success": bool(row["success"]), "details": json.loads(row["details"])} for row in rows]
+
+    def close(self) -> None:
+        self.reader.close()
+        self.writer.close()
+
+audit_log = AuditLog(AUDIT_LOG_PATH, AUDIT_JSONL_PATH)
+
+def audited(action: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            result = await func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            details = dict(bound.arguments)
+            key_id = details.pop("key_id", None)
+            if key_id is None and isinstance(result, dict):
+                key_id = next((value.get("id") for value in result.get("data", {}).values() if isinstance(value, dict)), None)
+            audit_log.record(action, key_id, bool(result), details.pop("reason", None), details)
+            return result
+        return wrapper
+    return decorator
+
+metrics.describe("key_operations_total", "counter", "Multi-step key operations, by operation and outcome.")
+
+class StepFailed(Exception):
+    def __init__(self, message: str, retryable: bool = False, status: Optional[int] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.status = status
+
+def check_step_status(status: int, expected: Iterable[int], action: str) -> None:
+    if status not in expected:
+        raise StepFailed(f"{action} returned HTTP {status}", retryable=status == 429 or status >= 500, status=status)
+
+class SQLiteStore:
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+
+    def locked(self, method: Callable[..., T], *args: Any) -> T:
+        with self.lock:
+            return method(*args)
+
+    async def call(self, method: Callable[..., T], *args: Any) -> T:
+        return await asyncio.to_thread(self.locked, method, *args)
+
+class OperationStore(SQLiteStore):
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS operations (id TEXT PRIMARY KEY, result TEXT NOT NULL, finished_at REAL NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS operation_steps ("
+            "operation_id TEXT NOT NULL, step TEXT NOT NULL, result TEXT NOT NULL, created_at REAL NOT NULL, "
+            "PRIMARY KEY (operation_id, step))"
+        )
+
+    def result(self, operation_id: str) -> Optional[Any]:
+        row = self.connection.execute("SELECT result FROM operations WHERE id = ?", (operation_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def steps(self, operation_id: str) -> Dict[str, Any]:
+        rows = self.connection.execute("SELECT step, result FROM operation_steps WHERE operation_id = ?", (operation_id,))
+        return {step: json.loads(result) for step, result in rows}
+
+    def save_step(self, operation_id: str, step: str, result: Any) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO operation_steps (operation_id, step, result, created_at) VALUES (?, ?, ?, ?)",
+            (operation_id, step, json.dumps(result), time.time())
+        )
+
+    def finish(self, operation_id: str, result: Optional[Any]) -> None:
+        with self.connection:
+            self.connection.execute("BEGIN")
+            if result is not None:
+                self.connection.execute("INSERT OR REPLACE INTO operations (id, result, finished_at) VALUES (?, ?, ?)",
+                                        (operation_id, json.dumps(result), time.time()))
+            self.connection.execute("DELETE FROM operation_steps WHERE operation_id = ?", (operation_id,))
+
+    def purge(self, max_age: float) -> None:
+        cutoff = time.time() - max_age
+        self.connection.execute("DELETE FROM operations WHERE finished_at < ?", (cutoff,))
+        self.connection.execute("DELETE FROM operation_steps WHERE created_at < ?", (cutoff,))
+
+operation_store = OperationStore(JOB_QUEUE_PATH)
+
+class KeyOperation:
+    def __init__(self, name: str, key_id: str):
+        scope = operation_scope.get()
+        self.id = f"{scope}:{name}:{key_id}" if scope else None
+        self.completed: Dict[str, Any] = {}
+
+    async def step(self, name: str, action: Callable[[], Awaitable[T]], idempotent: bool = True) -> T:
+        if self.id:
+            record_cache_lookup("operation_steps", name in self.completed)
+        if name in self.completed:
+            return self.completed[name]
+        for attempt in range(OPERATION_STEP_RETRIES + 1):
+            try:
+                result = await action()
+                break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                failure = StepFailed(f"{name} failed: {type(e).__name__}", retryable=idempotent)
+            except StepFailed as e:
+                failure = e
+            if not failure.retryable or (not idempotent and failure.status != 429) or attempt == OPERATION_STEP_RETRIES:
+                raise failure
+            await asyncio.sleep(api.backoff(attempt))
+        self.completed[name] = result
+        if self.id:
+            with contextlib.suppress(sqlite3.Error):
+                await operation_store.call(operation_store.save_step, self.id, name, result)
+        return result
+
+async def run_key_operation(name: str, key_id: str, flow: Callable[[KeyOperation], Awaitable[bool]],
+                            reason: Optional[str] = None, details: Optional[Dict[str, Any]] = None) -> bool:
+    operation = KeyOperation(name, key_id)
+    finished = None
+    if operation.id:
+        try:
+            finished = await operation_store.call(operation_store.result, operation.id)
+            operation.completed = await operation_store.call(operation_store.steps, operation.id)
+        except sqlite3.Error:
+            pass
+    if finished is not None:
+        metrics.inc("key_operations_total", {"operation": name, "outcome": "replayed"})
+        return finished
+    try:
+        result = await flow(operation)
+        outcome = "done"
+    except Exception:
+        result = False
+        outcome = "aborted"
+    if operation.id:
+        with contextlib.suppress(sqlite3.Error):
+            await operation_store.call(operation_store.finish, operation.id, result if outcome == "done" else None)
+    metrics.inc("key_operations_total", {"operation": name, "outcome": outcome})
+    audit_log.record(name, key_id, result, reason, details)
+    return result
+
+async def get_key_details(key_id: str) -> Optional[Dict[str, Any]]:
+    cached = key_cache.get("key", key_id)
+    if cached is not None:
+        return cached
+    return await single_flight.do(("key", key_id), lambda: request_key_details(key_id))
+
+async def request_key_details(key_id: str) -> Optional[Dict[str, Any]]:
+    for family in key_routes.order(key_id):
+        try:
+            status, data = await api.get(KEY_ENDPOINTS[family].format(key_id=key_id, service_id=SERVICE_ID))
+            if status == 200:
                 if data.get("success"):
-                    return data.get("data", {}).get("defaultKey") or data.get("data", {}).get("premiumKey") or data.get("data", {})
+                    key_routes.record(key_id, family)
+                    key_data = data.get("data", {}).get("defaultKey") or data.get("data", {}).get("premiumKey") or data.get("data", {})
+                    key_cache.set("key", key_id, key_data)
+                    observe_keys([{"id": key_id, **key_data}])
+                    return key_data
         except Exception:
             continue
+    key_routes.forget(key_id)
     return None
 
-def get_key_data_by_name(key_name: str) -> Optional[Dict[str, Any]]:
-    try:
-        url = f"{AUTHGUARD_API_URL}/key-manager/default-key"
-        response = requests.get(url, headers=get_auth_headers(), timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            default_keys_list = data.get("data", {}).get("defaultKeys")
-            if not isinstance(default_keys_list, list):
-                return None
-            for key_data in default_keys_list:
-                if key_data.get("key") == key_name:
-                    return key_data
-            return None
-        return None
-    except Exception:
-        return None
+async def iter_key_details(key_ids: List[str], concurrency: int = LOOKUP_CONCURRENCY) -> AsyncIterator[Tuple[str, Optional[Dict[str, Any]]]]:
+    semaphore = asyncio.Semaphore(max(1, concurrency))
 
-def create_24h_key() -> Optional[Dict[str, Any]]:
+    async def fetch(key_id: str) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            return await get_key_details(key_id)
+
+    tasks = [asyncio.create_task(fetch(key_id)) for key_id in key_ids]
     try:
-        url = f"{AUTHGUARD_API_URL}/key-manager/default-key"
-        payload = {
-            "expiredAt": int((datetime.utcnow() + timedelta(hours=24)).timestamp())
-        }
-        response = requests.post(url, headers=get_auth_headers(), json=payload)
-        if response.status_code == 201:
-            return response.json()
-        return None
-    except Exception:
+        for key_id, task in zip(key_ids, tasks):
+            yield key_id, await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def fetch_default_keys() -> Optional[List[Dict[str, Any]]]:
+    if not await default_key_index.refresh():
         return None
+    return list(default_key_index.by_id.values())
+
+async def iter_json_array_items(chunks: AsyncIterator[bytes], field: str, state: Optional[Dict[str, Any]] = None) -> AsyncIterator[Any]:
+    state = state if state is not None else {}
+    state.update(found=False, complete=False, envelope="")
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    marker = f'"{field}"'
+    buffer = ""
+    in_array = False
+    async for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        if state["complete"]:
+            state["envelope"] += buffer
+            buffer = ""
+            continue
+        if not in_array:
+            start = buffer.find(marker)
+            if start < 0:
+                state["envelope"] += buffer[:-len(marker)]
+                buffer = buffer[-len(marker):]
+                continue
+            bracket = buffer.find("[", start + len(marker))
+            if bracket < 0:
+                state["envelope"] += buffer[:start]
+                buffer = buffer[start:]
+                continue
+            state["envelope"] += buffer[:bracket + 1]
+            buffer = buffer[bracket + 1:]
+            in_array = True
+            state["found"] = True
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position >= len(buffer):
+                break
+            if buffer[position] == "]":
+                state["complete"] = True
+                break
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break
+            yield item
+        buffer = buffer[position:]
+        if state["complete"]:
+            in_array = False
+            state["envelope"] += buffer
+            buffer = ""
+    state["envelope"] += buffer + text_decoder.decode(b"", final=True)
+
+class KeyListSync:
+    def __init__(self, path: str, field: str, page_size: int = 1000, since_param: str = "", full_every: int = 10):
+        self.path = path
+        self.field = field
+        self.page_size = page_size
+        self.since_param = since_param
+        self.full_every = max(1, full_every)
+        self.etags: Dict[int, str] = {}
+        self.page_ids: Dict[int, List[str]] = {}
+        self.since: Optional[Any] = None
+        self.runs = 0
+
+    async def fetch_page(self, page: int, params: Optional[Dict[str, Any]], conditional: bool) -> Optional[Tuple[bool, List[Dict[str, Any]]]]:
+        headers = {"If-None-Match": self.etags[page]} if conditional and page in self.etags else None
+        async with api.stream(self.path, params=params, headers=headers) as response:
+            if response.status == 304:
+                return True, []
+            if response.status != 200:
+                return None
+            state: Dict[str, Any] = {}
+            items = [item async for item in iter_json_array_items(response.content.iter_chunked(65536), self.field, state) if isinstance(item, dict)]
+            if not state["complete"] or re.search(r'"success"\s*:\s*false', state["envelope"]):
+                self.etags.pop(page, None)
+                return None
+            etag = response.headers.get("ETag")
+            if conditional and etag:
+                self.etags[page] = etag
+            else:
+                self.etags.pop(page, None)
+            return False, items
+
+    async def run(self, known: Dict[str, Dict[str, Any]]) -> Optional[Tuple[List[Dict[str, Any]], List[str]]]:
+        incremental = bool(self.since_param and self.since is not None and self.runs % self.full_every)
+        self.runs += 1
+        changed: List[Dict[str, Any]] = []
+        seen: set = set()
+        page = 1
+        while True:
+            params: Dict[str, Any] = {"page": page, "limit": self.page_size} if self.page_size else {}
+            if incremental:
+                params[self.since_param] = self.since
+            result = await self.fetch_page(page, params or None, not incremental)
+            if result is None:
+                return None
+            not_modified, items = result
+            if not_modified:
+                ids = self.page_ids.get(page, [])
+                seen.update(ids)
+                count = len(ids)
+            else:
+                ids = [item["id"] for item in items if item.get("id")]
+                if page > 1 and ids and ids[0] in seen:
+                    break
+                if not incremental:
+                    self.page_ids[page] = ids
+                for item in items:
+                    if not item.get("id"):
+                        continue
+                    seen.add(item["id"])
+                    if known.get(item["id"]) != item:
+                        changed.append(item)
+                    created_ts = to_unix_seconds(item.get("createdAt"))
+                    if created_ts is not None and (self.since is None or created_ts > to_unix_seconds(self.since)):
+                        self.since = item["createdAt"]
+                count = len(items)
+            if not self.page_size or not count:
+                break
+            page += 1
+        removed = [] if incremental else [key_id for key_id in known if key_id not in seen]
+        return changed, removed
+
+key_observers: List[Any] = []
+
+def observe_keys(keys: List[Dict[str, Any]]) -> None:
+    for observer in key_observers:
+        observer.upsert_many(keys)
+
+def forget_keys(key_ids: List[str]) -> None:
+    for observer in key_observers:
+        observer.remove_many(key_ids)
+
+class KeyIndex:
+    def __init__(self, name: str, path: str, field: str, max_age: float = 300):
+        self.name = name
+        self.max_age = max_age
+        self.refreshed_at = 0.0
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_name: Dict[str, str] = {}
+        self.sync_state = KeyListSync(path, field, SYNC_PAGE_SIZE, SYNC_SINCE_PARAM, SYNC_FULL_EVERY)
+        self._lock = asyncio.Lock()
+
+    def is_fresh(self) -> bool:
+        return self.refreshed_at > 0 and time.monotonic() - self.refreshed_at <= self.max_age
+
+    def apply(self, changed: List[Dict[str, Any]], removed: List[str]) -> None:
+        for key_data in changed:
+            self.upsert(key_data)
+        for key_id in removed:
+            key_data = self.by_id.pop(key_id, None)
+            if key_data and self.by_name.get(key_data.get("key")) == key_id:
+                del self.by_name[key_data["key"]]
+        self.refreshed_at = time.monotonic()
+        observe_keys(changed)
+        forget_keys(removed)
+
+    def upsert(self, key_data: Dict[str, Any]) -> None:
+        key_id = key_data.get("id")
+        if not key_id:
+            return
+        previous = self.by_id.get(key_id)
+        if previous and previous.get("key") != key_data.get("key"):
+            self.by_name.pop(previous.get("key"), None)
+        self.by_id[key_id] = key_data
+        if key_data.get("key"):
+            self.by_name[key_data["key"]] = key_id
+
+    def update(self, key_id: str, fields: Dict[str, Any]) -> None:
+        key_data = self.by_id.get(key_id)
+        if key_data is not None:
+            self.upsert({**key_data, **fields})
+
+    def get_by_id(self, key_id: str) -> Optional[Dict[str, Any]]:
+        key_data = self.by_id.get(key_id)
+        return dict(key_data) if key_data is not None else None
+
+    def get_by_name(self, key_name: str) -> Optional[Dict[str, Any]]:
+        key_id = self.by_name.get(key_name)
+        record_cache_lookup(self.name, key_id is not None)
+        return self.get_by_id(key_id) if key_id is not None else None
+
+    async def refresh(self) -> bool:
+        return await single_flight.do(("key-list", self.name), self.sync)
+
+    async def sync(self) -> bool:
+        try:
+            result = await self.sync_state.run(self.by_id)
+        except Exception:
+            return False
+        if result is None:
+            return False
+        self.apply(*result)
+        return True
 
-def create_premium_key(duration_seconds: int) -> Optional[Dict[str, Any]]:
+    async def ensure_fresh(self) -> None:
+        if self.is_fresh():
+            return
+        async with self._lock:
+            if not self.is_fresh():
+                await self.refresh()
+
+default_key_index = KeyIndex("default_key_index", "/key-manager/default-key", "defaultKeys", KEY_INDEX_MAX_AGE)
+premium_key_index = KeyIndex("premium_key_index", "/key-manager/premium-key", "premiumKeys", KEY_INDEX_MAX_AGE)
+
+def record_key_change(key_id: str, fields: Dict[str, Any]) -> None:
+    default_key_index.update(key_id, fields)
+    premium_key_index.update(key_id, fields)
+    key_cache.invalidate(key_id)
+    observe_keys([{"id": key_id, **fields}])
+
+async def get_key_data_by_name(key_name: str) -> Optional[Dict[str, Any]]:
+    await default_key_index.ensure_fresh()
+    return default_key_index.get_by_name(key_name)
+
+async def create_24h_key() -> Optional[Dict[str, Any]]:
+    return await create_default_key(86400)
+
+KEY_CREATION_FIELDS = {"default": "defaultKey", "premium": "premiumKey"}
+KEY_CREATION_ACTIONS = {"default": "create_key", "premium": "create_premium_key"}
+UNCONFIRMED_KEYS_NOTE = "{count} request(s) lost their response or hit an AuthGuard server error, so those keys may have been created without being listed here."
+
+async def post_new_key(key_type: str, duration_seconds: int) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+    payload = {"expiredAt": int((datetime.utcnow() + timedelta(seconds=duration_seconds)).timestamp())}
     try:
-        url = f"{AUTHGUARD_API_URL}/key-manager/premium-key"
-        expired_at = int((datetime.utcnow() + timedelta(seconds=duration_seconds)).timestamp())
-        payload = {"expiredAt": expired_at}
-        response = requests.post(url, headers=get_auth_headers(), json=payload)
-        if response.status_code == 201:
-            return response.json()
-        return None
-    except Exception:
-        return None
+        status, data = await api.post(f"/key-manager/{key_type}-key", json_body=payload)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return None, None
+    if status != 201:
+        return status, None
+    key_data = data.get("data", {}).get(KEY_CREATION_FIELDS[key_type], {})
+    if key_data.get("id"):
+        key_routes.record(key_data["id"], key_type)
+        (premium_key_index if key_type == "premium" else default_key_index).upsert(key_data)
+        observe_keys([key_data])
+    return status, data
+
+@audited("create_key")
+async def create_default_key(duration_seconds: int) -> Optional[Dict[str, Any]]:
+    return (await post_new_key("default", duration_seconds))[1]
+
+@audited("create_premium_key")
+async def create_premium_key(duration_seconds: int) -> Optional[Dict[str, Any]]:
+    return (await post_new_key("premium", duration_seconds))[1]
 
-def change_key_hwid(key_id: str) -> bool:
+@audited("reset_hwid")
+async def change_key_hwid(key_id: str) -> bool:
     try:
-        url = f"{AUTHGUARD_API_URL}/key-manager/default-key/{key_id}"
         payload = {"hwid": ""}
-        response = requests.patch(url, headers=get_auth_headers(), json=payload)
-        if response.status_code == 200:
-            response_data = response.json()
+        status, response_data = await api.patch(f"/key-manager/default-key/{key_id}", json_body=payload)
+        if status == 200:
             if response_data.get("success"):
+                record_key_change(key_id, payload)
                 return True
             return False
         return False
     except Exception:
         return False
 
-def blacklist_key(key_id: str, duration_seconds: int = 604800, reason: str = "No reason provided") -> bool:
-    key_data = get_key_details(key_id)
-    if not key_data:
-        return False
-    hwid = key_data.get("hwid")
-    if not hwid:
-        return disable_key(key_id, duration_seconds, reason)
-    try:
-        url = f"{AUTHGUARD_API_URL}/key-manager/blacklist"
+async def patch_default_key(key_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    status, response_data = await api.patch(f"/key-manager/default-key/{key_id}", json_body=payload)
+    check_step_status(status, (200,), "Updating the key")
+    if not response_data.get("success"):
+        raise StepFailed("Updating the key was rejected")
+    record_key_change(key_id, payload)
+    return payload
+
+async def post_blacklist_entry(payload: Dict[str, Any]) -> Dict[str, Any]:
+    status, response_data = await api.post("/key-manager/blacklist", json_body=payload)
+    if status >= 500:
+        blacklist_id = await request_blacklist_entry(payload["hwid"])
+        if blacklist_id:
+            return {"id": blacklist_id}
+    check_step_status(status, (201,), "Creating the blacklist entry")
+    if not response_data.get("success"):
+        raise StepFailed("Creating the blacklist entry was rejected")
+    return response_data.get("data", {}).get("blacklist") or {}
+
+async def blacklist_key(key_id: str, duration_seconds: int = 604800, reason: str = "No reason provided") -> bool:
+    async def flow(operation: KeyOperation) -> bool:
+        key_data = await operation.step("lookup", lambda: get_key_details(key_id))
+        if not key_data:
+            return False
         expired_at = int((datetime.utcnow() + timedelta(seconds=duration_seconds)).timestamp())
+        hwid = key_data.get("hwid")
+        if not hwid:
+            await operation.step("disable", lambda: patch_default_key(key_id, {"expiredAt": expired_at}))
+            return True
         payload = {"hwid": hwid, "ip": None, "reason": reason, "expiredAt": expired_at}
-        response = requests.post(url, headers=get_auth_headers(), json=payload)
-        if response.status_code == 201:
-            response_data = response.json()
-            if response_data.get("success"):
-                return True
-            return False
-        return False
-    except Exception:
-        return False
+        entry = await operation.step("blacklist", lambda: post_blacklist_entry(payload), idempotent=False)
+        if entry.get("id"):
+            blacklist_index.add({**payload, **entry}, key_id)
+        record_key_change(key_id, {"isBlacklisted": True})
+        return True
 
-def disable_key(key_id: str, duration_seconds: int, reason: str) -> bool:
-    try:
-        expired_at = int((datetime.utcnow() + timedelta(seconds=duration_seconds)).timestamp())
-        url = f"{AUTHGUARD_API_URL}/key-manager/default-key/{key_id}"
-        payload = {"expiredAt": expired_at}
-        response = requests.patch(url, headers=get_auth_headers(), json=payload)
-        if response.status_code == 200:
-            response_data = response.json()
-            if response_data.get("success"):
-                return True
+    return await run_key_operation("blacklist", key_id, flow, reason, {"duration_seconds": duration_seconds})
+
+class BlacklistIndex:
+    def __init__(self):
+        self.by_hwid: Dict[str, Dict[str, Any]] = {}
+        self.by_key: Dict[str, str] = {}
+
+    def load(self, entries: List[Dict[str, Any]]) -> None:
+        self.by_hwid = {entry["hwid"]: entry for entry in entries if entry.get("hwid") and entry.get("id")}
+        self.by_key = {key_id: hwid for key_id, hwid in self.by_key.items() if hwid in self.by_hwid}
+
+    def add(self, entry: Dict[str, Any], key_id: Optional[str] = None) -> None:
+        if not entry.get("hwid") or not entry.get("id"):
+            return
+        self.by_hwid[entry["hwid"]] = entry
+        if key_id:
+            self.by_key[key_id] = entry["hwid"]
+
+    def remove(self, hwid: str) -> None:
+        self.by_hwid.pop(hwid, None)
+        self.by_key = {key_id: key_hwid for key_id, key_hwid in self.by_key.items() if key_hwid != hwid}
+
+    def get(self, hwid: str) -> Optional[Dict[str, Any]]:
+        entry = self.by_hwid.get(hwid)
+        record_cache_lookup("blacklist_index", entry is not None)
+        if entry is None:
+            return None
+        expired_at = entry.get("expiredAt")
+        if isinstance(expired_at, (int, float)) and expired_at:
+            if len(str(int(expired_at))) > 10:
+                expired_at = expired_at / 1000
+            if expired_at <= time.time():
+                self.remove(hwid)
+                return None
+        return entry
+
+    def get_by_key(self, key_id: str) -> Optional[Dict[str, Any]]:
+        hwid = self.by_key.get(key_id)
+        return self.get(hwid) if hwid is not None else None
+
+    async def refresh(self) -> bool:
+        try:
+            status, data = await api.get("/key-manager/blacklist", params={"serviceId": SERVICE_ID})
+            entries = data.get("data", {}).get("blacklist")
+            if status != 200 or not data.get("success") or not isinstance(entries, list):
+                return False
+            self.load(entries)
+            return True
+        except Exception:
             return False
-        return False
-    except Exception:
-        return False
 
-def get_blacklist_entry(hwid: str) -> Optional[str]:
+blacklist_index = BlacklistIndex()
+
+async def get_blacklist_entry(hwid: str) -> Optional[str]:
+    entry = blacklist_index.get(hwid)
+    if entry is not None:
+        return entry["id"]
+    return await single_flight.do(("blacklist", hwid), lambda: request_blacklist_entry(hwid))
+
+async def request_blacklist_entry(hwid: str) -> Optional[str]:
     try:
-        url = f"{AUTHGUARD_API_URL}/key-manager/blacklist"
         params = {"hwid": hwid, "serviceId": SERVICE_ID}
-        response = requests.get(url, headers=get_auth_headers(), params=params)
-        if response.status_code == 200:
-            data = response.json()
+        status, data = await api.get("/key-manager/blacklist", params=params)
+        if status == 200:
             if data.get("success") and data.get("data", {}).get("blacklist"):
                 for entry in data["data"]["blacklist"]:
                     if entry.get("hwid") == hwid:
+                        blacklist_index.add(entry)
                         return entry.get("id")
             return None
         return None
     except Exception:
         return None
 
-def restore_key_expiration(key_id: str, reason: str) -> bool:
-    try:
-        expired_at = int((datetime.utcnow() + timedelta(days=365)).timestamp())
-        url = f"{AUTHGUARD_API_URL}/key-manager/default-key/{key_id}"
-        payload = {"expiredAt": expired_at}
-        response = requests.patch(url, headers=get_auth_headers(), json=payload)
-        if response.status_code == 200:
-            response_data = response.json()
-            if response_data.get("success"):
+async def delete_blacklist_entry(hwid: str, blacklist_id: str) -> int:
+    status, _ = await api.delete(f"/key-manager/blacklist/{blacklist_id}")
+    if status in (200, 204, 404):
+        blacklist_index.remove(hwid)
+    return status
+
+async def remove_blacklist_entry(hwid: str, blacklist_id: str) -> int:
+    status = await delete_blacklist_entry(hwid, blacklist_id)
+    check_step_status(status, (200, 204, 404), "Deleting the blacklist entry")
+    return status
+
+async def whitelist_key(key_id: str, reason: str = "No reason provided") -> bool:
+    async def flow(operation: KeyOperation) -> bool:
+        entry = blacklist_index.get_by_key(key_id)
+        if entry is not None:
+            status = await operation.step("unblacklist_indexed", lambda: remove_blacklist_entry(entry["hwid"], entry["id"]))
+            if status != 404:
+                record_key_change(key_id, {"isBlacklisted": False})
                 return True
-            return False
-        return False
-    except Exception:
-        return False
 
-def whitelist_key(key_id: str, reason: str = "No reason provided") -> bool:
-    try:
-        key_data = get_key_details(key_id)
+        key_data = await operation.step("lookup", lambda: get_key_details(key_id))
         if not key_data:
             return False
         hwid = key_data.get("hwid")
-        if not hwid:
-            return restore_key_expiration(key_id, reason)
-        
-        blacklist_id = get_blacklist_entry(hwid)
+        blacklist_id = await operation.step("find_entry", lambda: get_blacklist_entry(hwid)) if hwid else None
         if not blacklist_id:
-            return restore_key_expiration(key_id, reason)
-            
-        url = f"{AUTHGUARD_API_URL}/key-manager/blacklist/{blacklist_id}"
-        response = requests.delete(url, headers=get_auth_headers())
-        
-        if response.status_code in (200, 204):
+            expired_at = int((datetime.utcnow() + timedelta(days=365)).timestamp())
+            await operation.step("restore", lambda: patch_default_key(key_id, {"expiredAt": expired_at}))
             return True
-        return False
-    except Exception:
-        return False
 
-def format_timestamp(timestamp_s: Optional[int]) -> str:
-    if timestamp_s is None or timestamp_s == 0:
+        status = await operation.step("unblacklist", lambda: remove_blacklist_entry(hwid, blacklist_id))
+        if status == 404:
+            return False
+        record_key_change(key_id, {"isBlacklisted": False})
+        return True
+
+    return await run_key_operation("whitelist", key_id, flow, reason)
+
+def format_id_list(ids: List[str], limit: int = 1024) -> str:
+    shown: List[str] = []
+    length = len("```\n\n```")
+    for index, item in enumerate(ids):
+        more = f"... and {len(ids) - index} more"
+        if length + len(item) + len(more) + 2 > limit:
+            shown.append(more)
+            break
+        shown.append(item)
+        length += len(item) + 1
+    return "```\n" + "\n".join(shown) + "\n```"
+
+def to_unix_seconds(value: Any) -> Optional[int]:
+    if isinstance(value, str):
+        try:
+            return int(datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp())
+        except ValueError:
+            if not value.isdigit():
+                return None
+            value = int(value)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not value:
+        return None
+    value = int(value)
+    return value // 1000 if len(str(abs(value))) > 10 else value
+
+class ExpiryIndex:
+    def __init__(self):
+        self.keys: Dict[str, Dict[str, Any]] = {}
+        self.expires_at: Dict[str, int] = {}
+        self.timeline: List[Tuple[int, str]] = []
+
+    def _unlink(self, key_id: str) -> None:
+        expires_ts = self.expires_at.pop(key_id, None)
+        if expires_ts is not None:
+            index = bisect.bisect_left(self.timeline, (expires_ts, key_id))
+            if index < len(self.timeline) and self.timeline[index] == (expires_ts, key_id):
+                del self.timeline[index]
+
+    def upsert_many(self, keys: List[Dict[str, Any]]) -> None:
+        rebuild = len(keys) > 64
+        for key_data in keys:
+            key_id = key_data.get("id")
+            if not key_id:
+                continue
+            record = {**self.keys.get(key_id, {}), **{field: key_data[field] for field in ("key", "expiredAt", "discordId") if field in key_data}}
+            self.keys[key_id] = record
+            expires_ts = to_unix_seconds(record.get("expiredAt"))
+            if self.expires_at.get(key_id) == expires_ts:
+                continue
+            if rebuild:
+                self.expires_at.pop(key_id, None)
+            else:
+                self._unlink(key_id)
+            if expires_ts is not None:
+                self.expires_at[key_id] = expires_ts
+                if not rebuild:
+                    bisect.insort(self.timeline, (expires_ts, key_id))
+        if rebuild:
+            self.timeline = sorted((expires_ts, key_id) for key_id, expires_ts in self.expires_at.items())
+
+    def remove_many(self, key_ids: List[str]) -> None:
+        for key_id in key_ids:
+            self._unlink(key_id)
+            self.keys.pop(key_id, None)
+
+    def between(self, start: float, end: float) -> List[str]:
+        low = bisect.bisect_right(self.timeline, (int(start), "\uffff"))
+        high = bisect.bisect_right(self.timeline, (int(end), "\uffff"))
+        return [key_id for _, key_id in self.timeline[low:high]]
+
+    def get(self, key_id: str) -> Dict[str, Any]:
+        return {"id": key_id, **self.keys.get(key_id, {}), "expiresTs": self.expires_at.get(key_id)}
+
+expiry_index = ExpiryIndex()
+key_observers.append(expiry_index)
+
+class DiscordKeyIndex:
+    def __init__(self):
+        self.owner_of: Dict[str, str] = {}
+        self.keys_of: Dict[str, set] = defaultdict(set)
+
+    def upsert_many(self, keys: List[Dict[str, Any]]) -> None:
+        for key_data in keys:
+            key_id = key_data.get("id")
+            if not key_id or "discordId" not in key_data:
+                continue
+            discord_id = str(key_data["discordId"]) if key_data["discordId"] else None
+            previous = self.owner_of.get(key_id)
+            if previous == discord_id:
+                continue
+            self.remove_many([key_id])
+            if discord_id:
+                self.owner_of[key_id] = discord_id
+                self.keys_of[discord_id].add(key_id)
+
+    def remove_many(self, key_ids: List[str]) -> None:
+        for key_id in key_ids:
+            discord_id = self.owner_of.pop(key_id, None)
+            if discord_id is not None:
+                self.keys_of[discord_id].discard(key_id)
+                if not self.keys_of[discord_id]:
+                    del self.keys_of[discord_id]
+
+    def get(self, discord_id: int) -> List[str]:
+        key_ids = self.keys_of.get(str(discord_id), set())
+        record_cache_lookup("discord_key_index", bool(key_ids))
+        return sorted(key_ids)
+
+discord_key_index = DiscordKeyIndex()
+key_observers.append(discord_key_index)
+
+class PrefixIndex:
+    def __init__(self, name: str, source: Callable[[], Dict[str, Any]], field: str):
+        self.name = name
+        self.source = source
+        self.field = field
+        self.entries: List[Tuple[str, str]] = []
+        self.members: set = set()
+        self.dirty = True
+
+    def changed(self, values: Iterable[Any]) -> bool:
+        source = self.source()
+        return len(source) != len(self.members) or any((value in source) != (value in self.members) for value in values)
+
+    def upsert_many(self, keys: List[Dict[str, Any]]) -> None:
+        self.dirty = self.dirty or self.changed(key_data.get(self.field) for key_data in keys)
+
+    def remove_many(self, key_ids: List[str]) -> None:
+        self.dirty = self.dirty or self.changed(key_ids if self.field == "id" else ())
+
+    def complete(self, prefix: str, limit: int = 25) -> List[str]:
+        if self.dirty:
+            self.members = set(self.source())
+            self.entries = sorted((value.casefold(), value) for value in self.members if value)
+            self.dirty = False
+        folded = prefix.casefold()
+        start = bisect.bisect_left(self.entries, (folded, ""))
+        matches = [value for term, value in self.entries[start:start + limit] if term.startswith(folded)]
+        record_cache_lookup(self.name, bool(matches))
+        return matches
+
+key_id_prefixes = PrefixIndex("key_id_prefixes", lambda: expiry_index.keys, "id")
+key_name_prefixes = PrefixIndex("key_name_prefixes", lambda: default_key_index.by_name, "key")
+key_observers.extend([key_id_prefixes, key_name_prefixes])
+
+async def key_id_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    choices = []
+    for key_id in key_id_prefixes.complete(current.strip()):
+        key_name = expiry_index.keys.get(key_id, {}).get("key")
+        choices.append(app_commands.Choice(name=f"{key_id} · {key_name}"[:100] if key_name else key_id, value=key_id))
+    return choices
+
+async def key_name_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    return [app_commands.Choice(name=key_name[:100], value=key_name) for key_name in key_name_prefixes.complete(current.strip())]
+
+NEVER_EXPIRES = 2 ** 62
+SEARCH_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "eq": operator.eq, "ne": operator.ne, "lt": operator.lt, "le": operator.le, "gt": operator.gt, "ge": operator.ge
+}
+
+class KeySnapshot:
+    def __init__(self, indexes: List[Tuple[str, KeyIndex]]):
+        self.indexes = indexes
+        self.dirty = True
+        self.records: List[Tuple[str, Dict[str, Any]]] = []
+        self.rows: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self.columns: Dict[str, Any] = {}
+        self._lock = asyncio.Lock()
+
+    def current(self, key_id: Optional[str]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        for kind, index in self.indexes:
+            key_data = index.by_id.get(key_id)
+            if key_data is not None:
+                return kind, key_data
+        return None
+
+    def upsert_many(self, keys: List[Dict[str, Any]]) -> None:
+        self.dirty = self.dirty or any(self.current(key_data.get("id")) != self.rows.get(key_data.get("id")) for key_data in keys)
+
+    def remove_many(self, key_ids: List[str]) -> None:
+        self.dirty = self.dirty or any(self.current(key_id) != self.rows.get(key_id) for key_id in key_ids)
+
+    @staticmethod
+    def build(records: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        columns: Dict[str, Any] = {
+            "kind": [kind for kind, _ in records],
+            "expiredAt": [to_unix_seconds(key_data.get("expiredAt")) or NEVER_EXPIRES for _, key_data in records],
+            "createdAt": [to_unix_seconds(key_data.get("createdAt")) or 0 for _, key_data in records],
+            "hwid": [bool(key_data.get("hwid")) for _, key_data in records],
+            "ip": [bool(key_data.get("ip")) for _, key_data in records],
+            "isBlacklisted": [bool(key_data.get("isBlacklisted")) for _, key_data in records],
+            "discordId": [str(key_data.get("discordId") or "") for _, key_data in records],
+            "note": [str(key_data.get("note") or "").lower() for _, key_data in records]
+        }
+        if numpy is not None:
+            for name in ("expiredAt", "createdAt"):
+                columns[name] = numpy.array(columns[name], dtype=numpy.int64)
+            for name in ("hwid", "ip", "isBlacklisted"):
+                columns[name] = numpy.array(columns[name], dtype=bool)
+            for name in ("kind", "discordId", "note"):
+                columns[name] = numpy.array(columns[name], dtype=str)
+        return columns
+
+    async def refresh(self) -> None:
+        if not self.dirty:
+            return
+        async with self._lock:
+            if not self.dirty:
+                return
+            self.dirty = False
+            records = [(kind, key_data) for kind, index in self.indexes for key_data in index.by_id.values()]
+            rows: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+            for kind, key_data in records:
+                rows.setdefault(key_data.get("id"), (kind, key_data))
+            self.columns = await asyncio.to_thread(self.build, records)
+            self.records = records
+            self.rows = rows
+
+    def search(self, conditions: List[Tuple[str, str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+        if numpy is not None:
+            mask = numpy.ones(len(self.records), dtype=bool)
+            for field, op, value in conditions:
+                column = self.columns[field]
+                mask &= numpy.char.find(column, value) >= 0 if op == "contains" else SEARCH_OPERATORS[op](column, value)
+            return [self.records[index] for index in numpy.flatnonzero(mask).tolist()]
+        matches: Iterable[int] = range(len(self.records))
+        for field, op, value in conditions:
+            column = self.columns[field]
+            if op == "contains":
+                matches = [index for index in matches if value in column[index]]
+            else:
+                compare = SEARCH_OPERATORS[op]
+                matches = [index for index in matches if compare(column[index], value)]
+        return [self.records[index] for index in matches]
+
+key_snapshot = KeySnapshot([("default", default_key_index), ("premium", premium_key_index)])
+key_observers.append(key_snapshot)
+
+class KeyStats:
+    def __init__(self):
+        self.keys: Dict[str, Dict[str, Any]] = {}
+        self.counts: Counter = Counter()
+        self.created_per_day: Counter = Counter()
+        self.expiring_per_day: Counter = Counter()
+
+    def _apply(self, record: Dict[str, Any], sign: int) -> None:
+        self.counts["total"] += sign
+        self.counts[record["kind"]] += sign
+        self.counts["blacklisted"] += sign * record["isBlacklisted"]
+        self.counts["hwid"] += sign * record["hwid"]
+        if record["createdDay"] is not None:
+            self.created_per_day[record["createdDay"]] += sign
+        if record["expiresTs"] is not None:
+            self.expiring_per_day[record["expiresTs"] // 86400] += sign
+
+    @staticmethod
+    def key_kind(key_id: str) -> str:
+        if key_id in premium_key_index.by_id:
+            return "premium"
+        if key_id in default_key_index.by_id:
+            return "default"
+        return key_routes.get(key_id) or "other"
+
+    def upsert_many(self, keys: List[Dict[str, Any]]) -> None:
+        for key_data in keys:
+            key_id = key_data.get("id")
+            if not key_id:
+                continue
+            previous = self.keys.get(key_id)
+            record = dict(previous) if previous else {"createdDay": None, "expiresTs": None, "isBlacklisted": False, "hwid": False}
+            record["kind"] = self.key_kind(key_id)
+            if "createdAt" in key_data:
+                created_ts = to_unix_seconds(key_data["createdAt"])
+                record["createdDay"] = created_ts // 86400 if created_ts is not None else None
+            if "expiredAt" in key_data:
+                record["expiresTs"] = to_unix_seconds(key_data["expiredAt"])
+            if "isBlacklisted" in key_data:
+                record["isBlacklisted"] = bool(key_data["isBlacklisted"])
+            if "hwid" in key_data:
+                record["hwid"] = bool(key_data["hwid"])
+            if record == previous:
+                continue
+            if previous:
+                self._apply(previous, -1)
+            self._apply(record, 1)
+            self.keys[key_id] = record
+
+    def remove_many(self, key_ids: List[str]) -> None:
+        for key_id in key_ids:
+            record = self.keys.pop(key_id, None)
+            if record:
+                self._apply(record, -1)
+
+    def summary(self, days: int = 14) -> Dict[str, Any]:
+        now = time.time()
+        today = int(now) // 86400
+        expired = bisect.bisect_right(expiry_index.timeline, (int(now), "\uffff"))
+        return {
+            "total": self.counts["total"],
+            "active": self.counts["total"] - expired,
+            "expired": expired,
+            "blacklisted": self.counts["blacklisted"],
+            "hwid": self.counts["hwid"],
+            "premium": self.counts["premium"],
+            "default": self.counts["default"],
+            "created": [(day, self.created_per_day[day]) for day in range(today - days + 1, today + 1)],
+            "expiring": [(day, self.expiring_per_day[day]) for day in range(today, today + days)]
+        }
+
+key_stats = KeyStats()
+key_observers.append(key_stats)
+
+def format_timestamp(timestamp_s: Any) -> str:
+    if not timestamp_s:
         return "N/A (Never Expires)"
-    try:
-        if len(str(timestamp_s)) > 10:
-             dt_object = datetime.fromtimestamp(timestamp_s / 1000, tz=timezone.utc)
-        else:
-             dt_object = datetime.fromtimestamp(timestamp_s, tz=timezone.utc)
-        return dt_object.strftime(DATE_FORMAT)
-    except Exception:
+    timestamp = to_unix_seconds(timestamp_s)
+    if timestamp is None:
         return f"Invalid Timestamp ({timestamp_s})"
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime(DATE_FORMAT)
+
+def format_discord_timestamp(value: Any, style: str = "F") -> Optional[str]:
+    timestamp = to_unix_seconds(value)
+    return f"<t:{timestamp}:{style}>" if timestamp is not None else None
 
 def check_key_expiration(key_info: Dict[str, Any]) -> str:
-    expired_at_ts = key_info.get('expiredAt')
-    current_ts = int(time.time())
-    if expired_at_ts is None or expired_at_ts == 0:
+    expired_at_ts = to_unix_seconds(key_info.get('expiredAt'))
+    if expired_at_ts is None:
         return "Permanent ✅"
-    
-    if len(str(expired_at_ts)) > 10:
-        expired_at_ts = int(expired_at_ts / 1000)
-        
-    if expired_at_ts <= current_ts:
+    if expired_at_ts <= int(time.time()):
         return "Expired 🔴"
     else:
         return "Valid 🟢"
 
-def get_premium_key_details(key_id: str) -> Optional[Dict[str, Any]]:
-    url = f"{AUTHGUARD_API_URL}/key-manager/premium-key/{key_id}"
-    
+class EmbedTemplate:
+    def __init__(self, title: str, description: Optional[str] = None, color: int = 0x00ff00,
+                 fields: Iterable[Tuple[str, str, bool]] = ()):
+        embed = discord.Embed(title=title, description=description, color=color)
+        for name, value, inline in fields:
+            embed.add_field(name=name, value=value, inline=inline)
+        embed.set_footer(text=CRAVEX_PROMO_LINK)
+        self.data = embed.to_dict()
+
+    def render(self, color: Optional[int] = None, **values: Any) -> discord.Embed:
+        data = {**self.data, "fields": [dict(field) for field in self.data.get("fields", [])]}
+        if values:
+            for part in ("title", "description"):
+                if part in data:
+                    data[part] = data[part].format(**values)
+        if color is not None:
+            data["color"] = color
+        embed = discord.Embed.from_dict(data)
+        embed.timestamp = discord.utils.utcnow()
+        return embed
+
+RESPONSES: Dict[str, EmbedTemplate] = {
+    "bulk_progress": EmbedTemplate("{title}", "Processed {done}/{total} key(s)."),
+    "invalid_key_ids": EmbedTemplate("❌ Invalid Key IDs", f"Provide between 1 and {BULK_OPERATION_MAX} key IDs, separated by spaces or new lines, or as an uploaded text file.", 0xff0000),
+    "default_key_created": EmbedTemplate("🔑 24-Hour Key Created Successfully!"),
+    "premium_key_created": EmbedTemplate("🔑 Premium Key Created Successfully!"),
+    "create_key_failed": EmbedTemplate("❌ Failed to Create Key", "Failed to create key. Please try again later.", 0xff0000),
+    "create_premium_key_failed": EmbedTemplate("❌ Failed to Create Premium Key", "Failed to create premium key. Please try again later.", 0xff0000),
+    "no_key_ids": EmbedTemplate("❌ No Key IDs Provided", "Please provide at least one valid key ID.", 0xff0000),
+    "fetch_keys_failed": EmbedTemplate("❌ Failed to Fetch Keys", "Could not retrieve details for any of the provided key IDs. Please check the IDs and try again.", 0xff0000),
+    "keys_json_generated": EmbedTemplate("📄 Keys JSON Generated Successfully!", "Found details for {count} key(s). The JSON file is attached below."),
+    "invalid_duration": EmbedTemplate("❌ Invalid Duration", "Invalid duration format. Please use format like `24d`, `1h`, or `20m`.", 0xff0000),
+    "invalid_count": EmbedTemplate("❌ Invalid Count", f"The count must be between 1 and {BULK_CREATE_MAX}.", 0xff0000),
+    "create_keys_failed": EmbedTemplate("❌ Failed to Create Keys", "None of the keys could be created. Please try again later.", 0xff0000),
+    "keys_created": EmbedTemplate("🔑 Keys Created Successfully!", "Created {count} {key_type} key(s). The keys are attached below."),
+    "invalid_discord_id": EmbedTemplate("❌ Invalid Discord ID", "The Discord ID must be a numeric value.", 0xff0000),
+    "invalid_premium_key_id": EmbedTemplate("❌ Invalid Key ID", "Could not verify key ID `{key_id}`. Ensure it is a valid Premium Key.", 0xff0000),
+    "discord_id_attached": EmbedTemplate("🔗 Discord ID Attached Successfully!", "The Discord ID has been linked to the Premium Key."),
+    "attach_discord_id_failed": EmbedTemplate("❌ Failed to Attach Discord ID", "Could not attach Discord ID to key `{key_id}`. Ensure the Key ID is correct and is a **Premium Key**.", 0xff0000),
+    "hwid_reset": EmbedTemplate("🔄 HWID Reset Successfully!", "The HWID for key ID `{key_id}` has been reset to empty."),
+    "hwid_reset_failed": EmbedTemplate("❌ Failed to Reset HWID", "Could not reset HWID for key ID `{key_id}`. Check the key ID and try again.", 0xff0000),
+    "key_blacklisted": EmbedTemplate("🚫 Key Blacklisted Successfully!", "The key `{key_id}` has been blacklisted.", 0xff0000),
+    "blacklist_failed": EmbedTemplate("❌ Failed to Blacklist Key", "Could not blacklist key `{key_id}`. Check the key ID and try again.", 0xff0000),
+    "key_whitelisted": EmbedTemplate("✅ Key Whitelisted Successfully!", "The key `{key_id}` has been whitelisted."),
+    "whitelist_failed": EmbedTemplate("❌ Failed to Whitelist Key", "Could not whitelist key `{key_id}`. Check the key ID and try again.", 0xff0000),
+    "key_id_found": EmbedTemplate("✅ Key ID Found!", "The Key ID for the provided key name."),
+    "key_id_not_found": EmbedTemplate("❌ Key ID Not Found", "Could not find Key ID for key name `{key_name}`.", 0xff0000),
+    "key_info_found": EmbedTemplate("✅ Key Information Found!", "Detailed information for the provided key."),
+    "key_info_not_found": EmbedTemplate("❌ Key Information Not Found", "Could not find information for key name `{key_name}`.", 0xff0000),
+    "key_status_checked": EmbedTemplate("✅ Key Status Checked!", "The status of the key `{key_id}`."),
+    "key_not_found": EmbedTemplate("❌ Key Not Found", "Could not find key `{key_id}`.", 0xff0000),
+    "expiring_keys": EmbedTemplate("⏰ Expiring Keys", "{count} known key(s) expire in the next {hours}h.", 0xffa500),
+    "expiry_notice": EmbedTemplate("⏰ Key Expiry Notice", color=0xffa500),
+    "no_user_keys": EmbedTemplate("❌ No Keys Found", "No keys are attached to {user}.", 0xff0000),
+    "user_keys_found": EmbedTemplate("✅ Keys Found!", "{count} key(s) attached to {user}."),
+    "export_too_large": EmbedTemplate("❌ Export Too Large", "The key export is larger than this server's upload limit, even compressed.", 0xff0000),
+    "default_keys_downloaded": EmbedTemplate("✅ Default Keys Downloaded!", "All default keys have been downloaded to a {file_format} file."),
+    "download_keys_failed": EmbedTemplate("❌ Failed to Download Keys", "Could not retrieve default keys. Please try again later.", 0xff0000),
+    "note_added": EmbedTemplate("✅ Note Added Successfully!", "The note has been added to the Premium Key."),
+    "key_stats": EmbedTemplate("📊 Key Statistics", "Counts over the locally synced default and premium keys."),
+    "search_results": EmbedTemplate("🔎 Key Search", "{count} of {total} known key(s) match ({ms} ms)."),
+    "export_queued": EmbedTemplate("🗂️ Export Queued", "The default keys are being exported to a {file_format} file. The file will be sent here, or by DM if this takes too long.", 0xffa500),
+    "jobs_list": EmbedTemplate("🗂️ Background Jobs", "{count} most recent job(s)."),
+    "job_status": EmbedTemplate("🗂️ Job #{job_id}"),
+    "job_not_found": EmbedTemplate("❌ Job Not Found", "There is no job `#{job_id}`.", 0xff0000),
+    "audit_log": EmbedTemplate("📜 Audit Log", "{count} matching event(s), newest first."),
+    "audit_log_batch": EmbedTemplate("📜 Key Changes", "{count} change(s) recorded.", 0x5865f2),
+    "job_failed": EmbedTemplate("❌ Job Failed", "Job `#{job_id}` failed: {error}", 0xff0000),
+    "add_note_failed": EmbedTemplate("❌ Failed to Add Note", "Could not add note to key `{key_id}`. Ensure the Key ID is correct and is a **Premium Key**.", 0xff0000)
+}
+
+async def send_embed(interaction: discord.Interaction, embed: discord.Embed, **kwargs: Any) -> Any:
+    message = await interaction.followup.send(embed=embed, **kwargs)
+    started_at = interaction.extras.get("started_at")
+    if started_at is not None:
+        command = getattr(interaction, "command", None)
+        metrics.observe("discord_response_duration_seconds", time.perf_counter() - started_at,
+                        {"command": command.qualified_name if command is not None else "unknown"})
+    return message
+
+def build_created_key_embed(template: str, key_info: Dict[str, Any], fallback_expiry: str) -> discord.Embed:
+    embed = RESPONSES[template].render()
+    embed.add_field(name="Key ID", value=f"`{key_info['id']}`", inline=False)
+    embed.add_field(name="Key", value=f"`{key_info['key']}`", inline=False)
+    embed.add_field(name="Created At", value=format_discord_timestamp(key_info.get('createdAt')) or f"<t:{int(time.time())}:F>", inline=True)
+    embed.add_field(name="Expires At", value=format_discord_timestamp(key_info.get('expiredAt')) or fallback_expiry, inline=True)
+    embed.add_field(name="⚠️ Important", value="Store this key securely; it cannot be retrieved again!", inline=False)
+    return embed
+
+async def get_premium_key_details(key_id: str) -> Optional[Dict[str, Any]]:
+    cached = key_cache.get("premium", key_id)
+    if cached is not None:
+        return cached
+    return await single_flight.do(("premium", key_id), lambda: request_premium_key_details(key_id))
+
+async def request_premium_key_details(key_id: str) -> Optional[Dict[str, Any]]:
     try:
-        response = requests.get(url, headers=get_auth_headers(), timeout=10)
+        status, data = await api.get(f"/key-manager/premium-key/{key_id}")
         
-        if response.status_code == 200:
-            data = response.json()
+        if status == 200:
             premium_key_info = data.get("data", {}).get("premiumKey")
             
             if premium_key_info:
+                key_routes.record(key_id, "premium")
+                key_cache.set("premium", key_id, premium_key_info)
+                observe_keys([{"id": key_id, **premium_key_info}])
                 return premium_key_info
             
             return None
@@ -270,154 +1736,421 @@ def get_premium_key_details(key_id: str) -> Optional[Dict[str, Any]]:
     except Exception:
         return None
 
-def attach_discord_id(key_id: str, discord_id: str) -> bool:
-    url = f"{AUTHGUARD_API_URL}/key-manager/premium-key/{key_id}"
+@audited("attach_discord_id")
+async def attach_discord_id(key_id: str, discord_id: str) -> bool:
     payload = {
         "discordId": discord_id
     }
     
     try:
-        response = requests.patch(
-            url,
-            headers=get_auth_headers(),
-            json=payload,
-            timeout=10
-        )
+        status, response_data = await api.patch(f"/key-manager/premium-key/{key_id}", json_body=payload)
         
-        if response.status_code == 200:
-            response_data = response.json()
+        if status == 200:
             if response_data.get("success"):
+                record_key_change(key_id, payload)
                 return True
             return False
         return False
     except Exception:
         return False
 
-def add_note_to_premium_key(key_id: str, note_content: str) -> bool:
-    url = f"{AUTHGUARD_API_URL}/key-manager/premium-key/{key_id}"
+@audited("add_note")
+async def add_note_to_premium_key(key_id: str, note_content: str) -> bool:
     payload = {
         "note": note_content
     }
     try:
-        response = requests.patch(url, headers=get_auth_headers(), json=payload)
-        if response.status_code == 200:
-            response_data = response.json()
+        status, response_data = await api.patch(f"/key-manager/premium-key/{key_id}", json_body=payload)
+        if status == 200:
             if response_data.get("success") and response_data.get("statusCode") == 200:
+                record_key_change(key_id, payload)
                 return True
             return False
         return False
     except Exception:
         return False
 
-def download_default_keys() -> bool:
-    url = f"{AUTHGUARD_API_URL}/key-manager/default-key"
-    
+async def create_keys_bulk(count: int, duration_seconds: int, key_type: str = "default") -> Tuple[List[Dict[str, Any]], int, int]:
+    semaphore = asyncio.Semaphore(max(1, BULK_CONCURRENCY))
+    key_field = KEY_CREATION_FIELDS[key_type]
+    rejected = asyncio.Event()
+    unconfirmed = 0
+
+    async def create_one() -> Optional[Dict[str, Any]]:
+        nonlocal unconfirmed
+        async with semaphore:
+            if rejected.is_set():
+                return None
+            status, data = await post_new_key(key_type, duration_seconds)
+            key_data = data.get("data", {}).get(key_field) if data else None
+            audit_log.record(KEY_CREATION_ACTIONS[key_type], key_data.get("id") if key_data else None, bool(key_data),
+                             details={"duration_seconds": duration_seconds, "status": status})
+            if key_data:
+                return key_data
+            if status is None or status >= 500:
+                unconfirmed += 1
+            else:
+                rejected.set()
+            return None
+
+    results = await asyncio.gather(*(create_one() for _ in range(count)))
+    created = [key_data for key_data in results if key_data]
+    return created, count - len(created), unconfirmed
+
+async def read_key_ids(key_ids: Optional[str], file: Optional[discord.Attachment]) -> List[str]:
+    text = key_ids or ""
+    if file is not None:
+        text += "\n" + (await file.read()).decode("utf-8", errors="ignore")
+    return list(dict.fromkeys(kid.strip() for kid in re.split(r"[\s,;]+", text) if kid.strip()))
+
+def render_export_chunk(keys: List[Dict[str, Any]], export_format: str) -> str:
+    if export_format == "jsonl":
+        return "".join(json.dumps(key_data) + "\n" for key_data in keys)
+    if export_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([key_data.get(field, "") for field in EXPORT_FIELDS] for key_data in keys)
+        return buffer.getvalue()
+    separator = "-" * 33 + "\n"
+    return "".join(f"{separator}Key : {key_data.get('key', 'N/A')}\nID : {key_data.get('id', 'N/A')}\n{separator}" for key_data in keys)
+
+def write_key_export(keys: Iterable[Dict[str, Any]], export_format: str, size_limit: int) -> Tuple[BinaryIO, bool, int]:
+    export_file = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
+    if export_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(EXPORT_FIELDS)
+        export_file.write(buffer.getvalue().encode("utf-8"))
+    chunk: List[Dict[str, Any]] = []
+    for key_data in keys:
+        chunk.append(key_data)
+        if len(chunk) >= EXPORT_CHUNK_SIZE:
+            export_file.write(render_export_chunk(chunk, export_format).encode("utf-8"))
+            chunk.clear()
+    if chunk:
+        export_file.write(render_export_chunk(chunk, export_format).encode("utf-8"))
+    compressed = export_file.tell() > size_limit
+    if compressed:
+        export_file.seek(0)
+        gzip_file = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
+        with gzip.GzipFile(fileobj=gzip_file, mode="wb") as gzip_stream:
+            shutil.copyfileobj(export_file, gzip_stream)
+        export_file.close()
+        export_file = gzip_file
+    size = export_file.tell()
+    export_file.seek(0)
+    return export_file, compressed, size
+
+async def download_default_keys(export_format: str = "txt", size_limit: int = discord.utils.DEFAULT_FILE_SIZE_LIMIT_BYTES) -> Optional[Tuple[BinaryIO, bool, int]]:
     try:
-        response = requests.get(url, headers=get_auth_headers(), timeout=10)
-        response.raise_for_status()
+        default_keys_list = await fetch_default_keys()
+        if default_keys_list is None:
+            return None
+        return await asyncio.to_thread(write_key_export, default_keys_list, export_format, size_limit)
+    except Exception:
+        return None
 
-        data = response.json()
-        default_keys_list = data.get("data", {}).get("defaultKeys")
+def build_bulk_progress_embed(title: str, done: int, total: int, succeeded: int, job_id: Optional[int] = None) -> discord.Embed:
+    embed = RESPONSES["bulk_progress"].render(color=0xffa500 if done < total else 0x00ff00, title=title, done=done, total=total)
+    embed.add_field(name="Succeeded", value=f"{succeeded}", inline=True)
+    embed.add_field(name="Failed", value=f"{done - succeeded}", inline=True)
+    if job_id is not None:
+        embed.add_field(name="Job", value=f"`#{job_id}`", inline=True)
+    return embed
 
-        if not isinstance(default_keys_list, list):
-            return False
-        
-        output_content = ""
-        separator = "-" * 33 + "\n"
-        
-        for key_data in default_keys_list:
-            key_value = key_data.get("key", "N/A")
-            key_id = key_data.get("id", "N/A")
-            
-            block = separator
-            block += f"Key : {key_value}\n"
-            block += f"ID : {key_id}\n"
-            block += separator
-            output_content += block
-
-        with open("default_keys_dump.txt", "w", encoding="utf-8") as f:
-            f.write(output_content)
-        
-        return True
+class JobQueue(SQLiteStore):
+    def __init__(self, path: str, lease: float = 60):
+        super().__init__(path)
+        self.lease = lease
+        self.owner = os.urandom(8).hex()
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, params TEXT NOT NULL, state TEXT NOT NULL, "
+            "user_id INTEGER NOT NULL, total INTEGER NOT NULL, done INTEGER NOT NULL DEFAULT 0, "
+            "checkpoint TEXT NOT NULL DEFAULT '{}', error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+            "owner TEXT, lease_until REAL NOT NULL DEFAULT 0)"
+        )
+        columns = {row["name"] for row in self.connection.execute("PRAGMA table_info(jobs)")}
+        if "owner" not in columns:
+            self.connection.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        if "lease_until" not in columns:
+            self.connection.execute("ALTER TABLE jobs ADD COLUMN lease_until REAL NOT NULL DEFAULT 0")
+        self.pending: "asyncio.Queue[int]" = asyncio.Queue()
 
-    except:
-        return False
+    @staticmethod
+    def to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["checkpoint"] = json.loads(job["checkpoint"])
+        return job
+
+    def submit(self, kind: str, params: Dict[str, Any], user_id: int, total: int) -> int:
+        now = time.time()
+        job_id = self.connection.execute(
+            "INSERT INTO jobs (kind, params, state, user_id, total, created_at, updated_at, owner, lease_until) "
+            "VALUES (?, ?, 'queued', ?, ?, ?, ?, ?, ?)",
+            (kind, json.dumps(params), user_id, total, now, now, self.owner, now + self.lease)
+        ).lastrowid
+        return job_id
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        row = self.connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self.to_dict(row) if row else None
+
+    def recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        rows = self.connection.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [self.to_dict(row) for row in rows]
+
+    def claim(self, job_id: int) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        cursor = self.connection.execute(
+            "UPDATE jobs SET state = 'running', updated_at = ?, lease_until = ? WHERE id = ? AND state = 'queued' AND owner = ?",
+            (now, now + self.lease, job_id, self.owner)
+        )
+        return self.get(job_id) if cursor.rowcount else None
+
+    def save_checkpoint(self, job_id: int, done: int, checkpoint: Dict[str, Any]) -> None:
+        now = time.time()
+        self.connection.execute(
+            "UPDATE jobs SET done = ?, checkpoint = ?, updated_at = ?, lease_until = ? WHERE id = ? AND owner = ?",
+            (done, json.dumps(checkpoint), now, now + self.lease, job_id, self.owner)
+        )
+
+    def finish(self, job_id: int, state: str, error: Optional[str] = None) -> None:
+        self.connection.execute("UPDATE jobs SET state = ?, error = ?, updated_at = ? WHERE id = ? AND owner = ?",
+                                (state, error, time.time(), job_id, self.owner))
+
+    def renew(self) -> None:
+        self.connection.execute("UPDATE jobs SET lease_until = ? WHERE owner = ? AND state IN ('queued', 'running')",
+                                (time.time() + self.lease, self.owner))
+
+    def recover(self) -> List[int]:
+        now = time.time()
+        rows = self.connection.execute(
+            "SELECT id FROM jobs WHERE state IN ('queued', 'running') AND lease_until < ? ORDER BY id", (now,)
+        ).fetchall()
+        recovered = []
+        for row in rows:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET state = 'queued', owner = ?, lease_until = ? WHERE id = ? AND state IN ('queued', 'running') AND lease_until < ?",
+                (self.owner, now + self.lease, row["id"], now)
+            )
+            if cursor.rowcount:
+                recovered.append(row["id"])
+        return recovered
+
+job_queue = JobQueue(JOB_QUEUE_PATH, JOB_LEASE_SECONDS)
+job_interactions: Dict[int, discord.Interaction] = {}
+job_messages: Dict[int, Any] = {}
+job_states: Dict[int, str] = {}
+job_workers: List["asyncio.Task[None]"] = []
+
+async def deliver_job_result(job: Dict[str, Any], content: Optional[str] = None, embed: Optional[discord.Embed] = None,
+                             fp: Optional[BinaryIO] = None, filename: Optional[str] = None) -> None:
+    kwargs: Dict[str, Any] = {}
+    if content is not None:
+        kwargs["content"] = content
+    if embed is not None:
+        kwargs["embed"] = embed
+    interaction = job_interactions.pop(job["id"], None)
+    job_messages.pop(job["id"], None)
+    if interaction is not None and discord.utils.utcnow() - interaction.created_at < timedelta(minutes=14):
+        try:
+            if fp is not None:
+                fp.seek(0)
+                kwargs["file"] = discord.File(fp, filename=filename)
+            await interaction.followup.send(ephemeral=True, **kwargs)
+            return
+        except discord.HTTPException:
+            pass
+    try:
+        if fp is not None:
+            fp.seek(0)
+            kwargs["file"] = discord.File(fp, filename=filename)
+        user = bot.get_user(job["user_id"]) or await bot.fetch_user(job["user_id"])
+        await user.send(**kwargs)
+    except discord.HTTPException:
+        pass
+
+BULK_JOB_OPERATIONS: Dict[str, Tuple[str, Callable[[str, Dict[str, Any]], Awaitable[bool]]]] = {
+    "blacklist": ("🚫 Bulk Blacklist", lambda key_id, params: blacklist_key(key_id, params["duration_seconds"], params["reason"])),
+    "whitelist": ("✅ Bulk Whitelist", lambda key_id, params: whitelist_key(key_id, params["reason"])),
+    "resethwid": ("🔄 Bulk HWID Reset", lambda key_id, params: change_key_hwid(key_id))
+}
+
+async def run_bulk_job(job: Dict[str, Any]) -> None:
+    params = job["params"]
+    title, operation = BULK_JOB_OPERATIONS[params["operation"]]
+    key_id_list: List[str] = params["key_ids"]
+    results: List[bool] = job["checkpoint"].get("results", [])
+    semaphore = asyncio.Semaphore(max(1, BULK_CONCURRENCY))
+
+    async def run_one(key_id: str) -> bool:
+        async with semaphore:
+            try:
+                return bool(await operation(key_id, params))
+            except Exception:
+                return False
+
+    last_report = time.monotonic()
+    while len(results) < len(key_id_list):
+        batch = key_id_list[len(results):len(results) + max(1, JOB_BATCH_SIZE)]
+        results.extend(await asyncio.gather(*(run_one(key_id) for key_id in batch)))
+        await checkpoint_job(job["id"], len(results), {"results": results})
+        message = job_messages.get(job["id"])
+        if message is not None and time.monotonic() - last_report >= BULK_PROGRESS_INTERVAL:
+            last_report = time.monotonic()
+            try:
+                await message.edit(embed=build_bulk_progress_embed(title, len(results), len(key_id_list), sum(results), job["id"]))
+            except discord.HTTPException:
+                pass
+    message = job_messages.get(job["id"])
+    if message is not None:
+        try:
+            await message.edit(embed=build_bulk_progress_embed(title, len(key_id_list), len(key_id_list), sum(results), job["id"]))
+        except discord.HTTPException:
+            pass
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["key_id", "result"])
+    writer.writerows((key_id, "ok" if success else "failed") for key_id, success in zip(key_id_list, results))
+    file_buffer = io.BytesIO(buffer.getvalue().encode("utf-8"))
+    await finish_job(job["id"], "done")
+    await deliver_job_result(job, content=f"{title} (job #{job['id']}): {sum(results)}/{len(results)} succeeded.", fp=file_buffer,
+                             filename=f"bulk_results_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv")
+    file_buffer.close()
+
+async def run_export_job(job: Dict[str, Any]) -> None:
+    params = job["params"]
+    file_format = params["file_format"]
+    export = await download_default_keys(file_format, params["size_limit"])
+    if not export:
+        await finish_job(job["id"], "failed", "Could not retrieve default keys.")
+        await deliver_job_result(job, embed=RESPONSES["download_keys_failed"].render())
+        return
+    export_file, compressed, size = export
+    try:
+        if size > params["size_limit"]:
+            await finish_job(job["id"], "failed", "Export is larger than the upload limit.")
+            await deliver_job_result(job, embed=RESPONSES["export_too_large"].render())
+            return
+        await checkpoint_job(job["id"], 1, {"size": size, "compressed": compressed})
+        await finish_job(job["id"], "done")
+        embed = RESPONSES["default_keys_downloaded"].render(file_format=file_format)
+        embed.add_field(name="Status", value="✅ File generated (gzip compressed)" if compressed else "✅ File generated", inline=True)
+        filename = f"default_keys_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{file_format}" + (".gz" if compressed else "")
+        await deliver_job_result(job, embed=embed, fp=export_file, filename=filename)
+    finally:
+        export_file.close()
+
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Awaitable[None]]] = {
+    "bulk": run_bulk_job,
+    "export": run_export_job
+}
+
+async def checkpoint_job(job_id: int, done: int, checkpoint: Dict[str, Any]) -> None:
+    with contextlib.suppress(sqlite3.Error):
+        await job_queue.call(job_queue.save_checkpoint, job_id, done, checkpoint)
+
+async def finish_job(job_id: int, state: str, error: Optional[str] = None) -> None:
+    for attempt in range(OPERATION_STEP_RETRIES + 1):
+        try:
+            await job_queue.call(job_queue.finish, job_id, state, error)
+            break
+        except sqlite3.Error:
+            await asyncio.sleep(api.backoff(attempt))
+    job_states[job_id] = state
+
+async def run_job_worker() -> None:
+    while True:
+        job_id = await job_queue.pending.get()
+        try:
+            job = await job_queue.call(job_queue.claim, job_id)
+        except sqlite3.Error:
+            await asyncio.sleep(api.backoff(0))
+            job_queue.pending.put_nowait(job_id)
+            continue
+        if job is None:
+            continue
+        metrics.set("job_queue_depth", job_queue.pending.qsize())
+        audit_actor.set(job["user_id"])
+        operation_scope.set(f"job:{job_id}")
+        try:
+            await JOB_HANDLERS[job["kind"]](job)
+        except Exception as e:
+            await finish_job(job_id, "failed", str(e) or type(e).__name__)
+            await deliver_job_result(job, embed=RESPONSES["job_failed"].render(job_id=job_id, error=str(e) or type(e).__name__))
+        metrics.inc("jobs_total", {"kind": job["kind"], "state": job_states.pop(job_id, "unknown")})
+
+@tasks.loop(seconds=max(1.0, JOB_LEASE_SECONDS / 3))
+async def renew_job_leases():
+    try:
+        await job_queue.call(job_queue.renew)
+        recovered = await job_queue.call(job_queue.recover)
+    except sqlite3.Error as e:
+        print(f"Could not renew job leases: {e}")
+        return
+    for job_id in recovered:
+        job_queue.pending.put_nowait(job_id)
+    if recovered:
+        print(f"Resuming {len(recovered)} unfinished job(s).")
+        metrics.set("job_queue_depth", job_queue.pending.qsize())
+
+def start_job_workers() -> None:
+    for _ in range(max(1, JOB_WORKERS)):
+        job_workers.append(asyncio.create_task(run_job_worker()))
+    renew_job_leases.start()
+
+async def submit_job(interaction: discord.Interaction, kind: str, params: Dict[str, Any], total: int, embed: discord.Embed) -> int:
+    job_id = await job_queue.call(job_queue.submit, kind, params, interaction.user.id, total)
+    job_queue.pending.put_nowait(job_id)
+    job_interactions[job_id] = interaction
+    embed.add_field(name="Job", value=f"`#{job_id}` · follow it with `/jobstatus {job_id}`", inline=False)
+    job_messages[job_id] = await send_embed(interaction, embed, ephemeral=True, wait=True)
+    metrics.set("job_queue_depth", job_queue.pending.qsize())
+    return job_id
+
+async def bulk_key_command(interaction: discord.Interaction, operation: str, key_ids: Optional[str], file: Optional[discord.Attachment],
+                           params: Optional[Dict[str, Any]] = None) -> None:
+    key_id_list = await read_key_ids(key_ids, file)
+    if not key_id_list or len(key_id_list) > BULK_OPERATION_MAX:
+        embed = RESPONSES["invalid_key_ids"].render()
+        await send_embed(interaction, embed, ephemeral=True)
+        return
+    title = BULK_JOB_OPERATIONS[operation][0]
+    await submit_job(interaction, "bulk", {"operation": operation, "key_ids": key_id_list, **(params or {})}, len(key_id_list),
+                     build_bulk_progress_embed(title, 0, len(key_id_list), 0))
+
+HELP_TEMPLATE = EmbedTemplate(
+    "📚 AuthGuard Bot Commands",
+    "Below is a list of all available commands for managing AuthGuard keys. These commands are restricted to server administrators.",
+    fields=[
+        ("/createkey", "Creates a 24-hour default key.\n**Usage**: `/createkey`\n**Example**: `/createkey`", False),
+        ("/createpremiumkey", "Creates a premium key with a custom expiration duration (e.g., 24d, 1h, 20m).\n**Usage**: `/createpremiumkey <duration>`\n**Example**: `/createpremiumkey 24d`", False),
+        ("/attachdiscordid", "Attaches a Discord User ID to a Premium Key ID.\n**Usage**: `/attachdiscordid <key_id> <discord_id>`\n**Example**: `/attachdiscordid 126b... 104472...`", False),
+        ("/resethwid", "Resets the HWID for a specific key to empty.\n**Usage**: `/resethwid <key_id>`\n**Example**: `/resethwid 126b2503-1f79-4db5-beee-468f9b45862f`", False),
+        ("/blacklistkey", "Blacklists a key for a specified duration (default 7d) with an optional reason.\n**Usage**: `/blacklistkey <key_id> [duration] [reason]`\n**Example**: `/blacklistkey 126b2503-1f79-4db5-beee-468f9b45862f 1h Test ban`", False),
+        ("/whitelistkey", "Whitelists (unbans) a key with an optional reason.\n**Usage**: `/whitelistkey <key_id> [reason]`\n**Example**: `/whitelistkey 126b2503-1f79-4db5-beee-468f9b45862f Test unban`", False),
+        ("/getkeysjson", "Generates and uploads a JSON file with details for specified keys.\n**Usage**: `/getkeysjson <key_ids>`\n**Example**: `/getkeysjson 126b2503... 2a3b4c5d...`", False),
+        ("/getdefaultkeyid", "Retrieves the Key ID for a given key name.\n**Usage**: `/getdefaultkeyid <key_name>`\n**Example**: `/getdefaultkeyid Cravex::Hub_1234567890`", False),
+        ("/getkeyinfo", "Retrieves detailed information for a given key name.\n**Usage**: `/getkeyinfo <key_name>`\n**Example**: `/getkeyinfo Cravex::Hub_1234567890`", False),
+        ("/iskeyexpired", "Checks if a key is expired by its Key ID.\n**Usage**: `/iskeyexpired <key_id>`\n**Example**: `/iskeyexpired 126b2503-1f79-4db5-beee-468f9b45862f`", False),
+        ("/downloaddefaultkeys", "Downloads all default keys to a txt, jsonl or csv file (gzipped if it is too large to upload).\n**Usage**: `/downloaddefaultkeys [file_format]`\n**Example**: `/downloaddefaultkeys csv`", False),
+        ("/addnotetopremiumkey", "Adds a note to a premium key.\n**Usage**: `/addnotetopremiumkey <key_id> <note>`\n**Example**: `/addnotetopremiumkey 126b2503... Customer purchased 1-year plan`", False),
+        ("/bulkcreatekeys", "Creates many default or premium keys at once and uploads them as a csv file.\n**Usage**: `/bulkcreatekeys <count> <duration> [key_type]`\n**Example**: `/bulkcreatekeys 100 7d premium`", False),
+        ("/keysforuser", "Lists the premium keys attached to a Discord user. Also available as the **AuthGuard Keys** right-click user menu.\n**Usage**: `/keysforuser <member>`\n**Example**: `/keysforuser @Cravex`", False),
+        ("/expiringkeys", "Lists known keys that expire within the given number of hours (default 24).\n**Usage**: `/expiringkeys [hours]`\n**Example**: `/expiringkeys 48`", False),
+        ("/bulkblacklist, /bulkwhitelist, /bulkresethwid", "Runs the blacklist, whitelist or HWID reset on many keys at once. Key IDs can be typed or uploaded as a text file.\n**Usage**: `/bulkblacklist [key_ids] [file] [duration] [reason]`\n**Example**: `/bulkresethwid file:keys.txt`", False),
+        ("/searchkeys", "Searches the locally synced default and premium keys. Filters can be combined.\n**Usage**: `/searchkeys [key_type] [expired] [expires_within] [created_within] [has_hwid] [has_ip] [blacklisted] [has_discord_id] [discord_id] [note]`\n**Example**: `/searchkeys expired:True has_hwid:True`", False),
+        ("/keystats", "Shows key counts and per-day creation and expiry histograms, optionally as a chart.\n**Usage**: `/keystats [chart]`\n**Example**: `/keystats chart:True`", False),
+        ("/auditlog", "Lists recorded key changes (creations, blacklists, whitelists, HWID resets, Discord ID links and notes), filtered by key, user and time range (`since` and `until` are how long ago, e.g. `7d`).\n**Usage**: `/auditlog [key_id] [user] [since] [until] [limit]`\n**Example**: `/auditlog since:7d until:1d`", False),
+        ("/jobs, /jobstatus", "Bulk commands and /downloaddefaultkeys run as background jobs that survive restarts. Lists recent jobs or shows the progress of one.\n**Usage**: `/jobstatus <job_id>`\n**Example**: `/jobstatus 12`", False),
+        ("⚠️ Note", "All commands require Administrator permissions. Duration formats: `Xd` (days), `Xh` (hours), `Xm` (minutes). For /getkeysjson, provide key IDs separated by spaces.", False)
+    ]
+)
 
 @bot.tree.command(name="help", description="Shows information about available commands")
 async def help_command(interaction: discord.Interaction):
-    embed = discord.Embed(
-        title="📚 AuthGuard Bot Commands",
-        description="Below is a list of all available commands for managing AuthGuard keys. These commands are restricted to server administrators.",
-        color=0x00ff00,
-        timestamp=datetime.utcnow()
-    )
-    embed.add_field(
-        name="/createkey",
-        value="Creates a 24-hour default key.\n**Usage**: `/createkey`\n**Example**: `/createkey`",
-        inline=False
-    )
-    embed.add_field(
-        name="/createpremiumkey",
-        value="Creates a premium key with a custom expiration duration (e.g., 24d, 1h, 20m).\n**Usage**: `/createpremiumkey <duration>`\n**Example**: `/createpremiumkey 24d`",
-        inline=False
-    )
-    embed.add_field(
-        name="/attachdiscordid",
-        value="Attaches a Discord User ID to a Premium Key ID.\n**Usage**: `/attachdiscordid <key_id> <discord_id>`\n**Example**: `/attachdiscordid 126b... 104472...`",
-        inline=False
-    )
-    embed.add_field(
-        name="/resethwid",
-        value="Resets the HWID for a specific key to empty.\n**Usage**: `/resethwid <key_id>`\n**Example**: `/resethwid 126b2503-1f79-4db5-beee-468f9b45862f`",
-        inline=False
-    )
-    embed.add_field(
-        name="/blacklistkey",
-        value="Blacklists a key for a specified duration (default 7d) with an optional reason.\n**Usage**: `/blacklistkey <key_id> [duration] [reason]`\n**Example**: `/blacklistkey 126b2503-1f79-4db5-beee-468f9b45862f 1h Test ban`",
-        inline=False
-    )
-    embed.add_field(
-        name="/whitelistkey",
-        value="Whitelists (unbans) a key with an optional reason.\n**Usage**: `/whitelistkey <key_id> [reason]`\n**Example**: `/whitelistkey 126b2503-1f79-4db5-beee-468f9b45862f Test unban`",
-        inline=False
-    )
-    embed.add_field(
-        name="/getkeysjson",
-        value="Generates and uploads a JSON file with details for specified keys.\n**Usage**: `/getkeysjson <key_ids>`\n**Example**: `/getkeysjson 126b2503... 2a3b4c5d...`",
-        inline=False
-    )
-    embed.add_field(
-        name="/getdefaultkeyid",
-        value="Retrieves the Key ID for a given key name.\n**Usage**: `/getdefaultkeyid <key_name>`\n**Example**: `/getdefaultkeyid Cravex::Hub_1234567890`",
-        inline=False
-    )
-    embed.add_field(
-        name="/getkeyinfo",
-        value="Retrieves detailed information for a given key name.\n**Usage**: `/getkeyinfo <key_name>`\n**Example**: `/getkeyinfo Cravex::Hub_1234567890`",
-        inline=False
-    )
-    embed.add_field(
-        name="/iskeyexpired",
-        value="Checks if a key is expired by its Key ID.\n**Usage**: `/iskeyexpired <key_id>`\n**Example**: `/iskeyexpired 126b2503-1f79-4db5-beee-468f9b45862f`",
-        inline=False
-    )
-    embed.add_field(
-        name="/downloaddefaultkeys",
-        value="Downloads all default keys to a text file.\n**Usage**: `/downloaddefaultkeys`\n**Example**: `/downloaddefaultkeys`",
-        inline=False
-    )
-    embed.add_field(
-        name="/addnotetopremiumkey",
-        value="Adds a note to a premium key.\n**Usage**: `/addnotetopremiumkey <key_id> <note>`\n**Example**: `/addnotetopremiumkey 126b2503... Customer purchased 1-year plan`",
-        inline=False
-    )
-    embed.add_field(
-        name="⚠️ Note",
-        value="All commands require Administrator permissions. Duration formats: `Xd` (days), `Xh` (hours), `Xm` (minutes). For /getkeysjson, provide key IDs separated by spaces.",
-        inline=False
-    )
-    embed.set_footer(text=CRAVEX_PROMO_LINK)
-    await interaction.response.send_message(embed=embed, ephemeral=True)
+    await interaction.response.send_message(embed=HELP_TEMPLATE.render(), ephemeral=True)
 
 @bot.tree.command(name="createkey", description="Creates a 24-hour key for administrators only")
 @commands.has_permissions(administrator=True)
@@ -426,49 +2159,13 @@ async def createkey(interaction: discord.Interaction):
         await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
         return
     await interaction.response.defer(ephemeral=True)
-    key_data = create_24h_key()
+    key_data = await create_24h_key()
     if key_data:
-        key_info = key_data['data']['defaultKey']
-        key = key_info['key']
-        key_id = key_info['id']
-        created_at = key_info['createdAt']
-        expires_at = key_info.get('expiredAt')
-        
-        embed = discord.Embed(title="🔑 24-Hour Key Created Successfully!", color=0x00ff00, timestamp=datetime.utcnow())
-        embed.add_field(name="Key ID", value=f"`{key_id}`", inline=False)
-        embed.add_field(name="Key", value=f"`{key}`", inline=False)
-
-        try:
-            created_ts = int(datetime.fromisoformat(created_at.replace('Z', '+00:00')).timestamp())
-        except ValueError:
-            created_ts = int(created_at / 1000) if isinstance(created_at, (int, float)) else int(time.time())
-
-        embed.add_field(name="Created At", value=f"<t:{created_ts}:F>", inline=True)
-        
-        expires_ts = None
-        if expires_at:
-            if isinstance(expires_at, str):
-                try:
-                    expires_ts = int(datetime.fromisoformat(expires_at.replace('Z', '+00:00')).timestamp())
-                except ValueError:
-                    expires_ts = None
-            elif isinstance(expires_at, (int, float)):
-                expires_ts = int(expires_at)
-                if len(str(expires_ts)) > 10:
-                    expires_ts = int(expires_ts / 1000)
-
-        if expires_ts:
-            embed.add_field(name="Expires At", value=f"<t:{expires_ts}:F>", inline=True)
-        else:
-            embed.add_field(name="Expires At", value="24 hours from creation", inline=True)
-            
-        embed.add_field(name="⚠️ Important", value="Store this key securely; it cannot be retrieved again!", inline=False)
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        embed = build_created_key_embed("default_key_created", key_data['data']['defaultKey'], "24 hours from creation")
+        await send_embed(interaction, embed, ephemeral=True)
     else:
-        embed = discord.Embed(title="❌ Failed to Create Key", description="Failed to create key. Please try again later.", color=0xff0000, timestamp=datetime.utcnow())
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        embed = RESPONSES["create_key_failed"].render()
+        await send_embed(interaction, embed, ephemeral=True)
 
 @bot.tree.command(name="getkeysjson", description="Generates and uploads a JSON file with details for specified keys")
 @commands.has_permissions(administrator=True)
@@ -479,42 +2176,43 @@ async def getkeysjson(interaction: discord.Interaction, key_ids: str):
     await interaction.response.defer(ephemeral=True)
     key_id_list = [kid.strip() for kid in key_ids.split() if kid.strip()]
     if not key_id_list:
-        embed = discord.Embed(title="❌ No Key IDs Provided", description="Please provide at least one valid key ID.", color=0xff0000, timestamp=datetime.utcnow())
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        embed = RESPONSES["no_key_ids"].render()
+        await send_embed(interaction, embed, ephemeral=True)
         return
-    keys = []
+    key_count = 0
     failed_keys = []
-    for key_id in key_id_list:
-        key_data = get_key_details(key_id)
+    file_buffer = io.StringIO()
+    file_buffer.write("[")
+    async for key_id, key_data in iter_key_details(key_id_list):
         if key_data:
-            keys.append({
+            entry = json.dumps({
                 "key_id": key_data.get("id", ""),
                 "key": key_data.get("key", ""),
                 "created_at": key_data.get("createdAt", ""),
                 "expired_at": key_data.get("expiredAt", ""),
                 "hwid": key_data.get("hwid", "")
-            })
+            }, indent=2)
+            file_buffer.write(("," if key_count else "") + "\n  " + entry.replace("\n", "\n  "))
+            key_count += 1
         else:
             failed_keys.append(key_id)
-    if not keys:
-        embed = discord.Embed(title="❌ Failed to Fetch Keys", description="Could not retrieve details for any of the provided key IDs. Please check the IDs and try again.", color=0xff0000, timestamp=datetime.utcnow())
+    file_buffer.write("\n]")
+    if not key_count:
+        file_buffer.close()
+        embed = RESPONSES["fetch_keys_failed"].render()
         if failed_keys:
-            embed.add_field(name="Failed Key IDs", value="```\n" + "\n".join(failed_keys) + "\n```", inline=False)
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+            embed.add_field(name="Failed Key IDs", value=format_id_list(failed_keys), inline=False)
+        await send_embed(interaction, embed, ephemeral=True)
         return
-    json_str = json.dumps(keys, indent=2)
-    file_buffer = io.StringIO(json_str)
+    file_buffer.seek(0)
     file = discord.File(file_buffer, filename=f"authguard_keys_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json")
-    embed = discord.Embed(title="📄 Keys JSON Generated Successfully!", description=f"Found details for {len(keys)} key(s). The JSON file is attached below.", color=0x00ff00, timestamp=datetime.utcnow())
+    embed = RESPONSES["keys_json_generated"].render(count=key_count)
     embed.add_field(name="Status", value="✅ File generated", inline=True)
-    embed.add_field(name="Number of Keys", value=f"{len(keys)}", inline=True)
+    embed.add_field(name="Number of Keys", value=f"{key_count}", inline=True)
     if failed_keys:
-        embed.add_field(name="Failed Key IDs", value="```\n" + "\n".join(failed_keys) + "\n```", inline=False)
+        embed.add_field(name="Failed Key IDs", value=format_id_list(failed_keys), inline=False)
         embed.add_field(name="⚠️ Note", value="Some keys could not be retrieved. Check the failed key IDs above.", inline=False)
-    embed.set_footer(text=CRAVEX_PROMO_LINK)
-    await interaction.followup.send(embed=embed, file=file, ephemeral=True)
+    await send_embed(interaction, embed, file=file, ephemeral=True)
     file_buffer.close()
 
 @bot.tree.command(name="createpremiumkey", description="Creates a premium key with custom expiration for administrators only")
@@ -526,59 +2224,62 @@ async def createpremiumkey(interaction: discord.Interaction, duration: str):
     await interaction.response.defer(ephemeral=True)
     duration_seconds = parse_duration(duration)
     if duration_seconds is None:
-        embed = discord.Embed(title="❌ Invalid Duration", description="Invalid duration format. Please use format like `24d`, `1h`, or `20m`.", color=0xff0000, timestamp=datetime.utcnow())
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        embed = RESPONSES["invalid_duration"].render()
+        await send_embed(interaction, embed, ephemeral=True)
         return
-    key_data = create_premium_key(duration_seconds)
+    key_data = await create_premium_key(duration_seconds)
     if key_data:
-        key_info = key_data['data']['premiumKey']
-        key = key_info['key']
-        key_id = key_info['id']
-        created_at = key_info['createdAt']
-        expires_at = key_info.get('expiredAt')
-        
-        embed = discord.Embed(title="🔑 Premium Key Created Successfully!", color=0x00ff00, timestamp=datetime.utcnow())
-        embed.add_field(name="Key ID", value=f"`{key_id}`", inline=False)
-        embed.add_field(name="Key", value=f"`{key}`", inline=False)
-        
-        try:
-            created_ts = int(datetime.fromisoformat(created_at.replace('Z', '+00:00')).timestamp())
-        except ValueError:
-            created_ts = int(created_at / 1000) if isinstance(created_at, (int, float)) else int(time.time())
-
-        embed.add_field(name="Created At", value=f"<t:{created_ts}:F>", inline=True)
-        
-        expires_ts = None
-        if expires_at:
-            if isinstance(expires_at, str):
-                try:
-                    expires_ts = int(datetime.fromisoformat(expires_at.replace('Z', '+00:00')).timestamp())
-                except ValueError:
-                    expires_ts = None
-            elif isinstance(expires_at, (int, float)):
-                expires_ts = int(expires_at)
-                if len(str(expires_ts)) > 10:
-                    expires_ts = int(expires_ts / 1000)
-
-        if expires_ts:
-            embed.add_field(name="Expires At", value=f"<t:{expires_ts}:F>", inline=True)
-        else:
-            duration_display = f"{duration_seconds // 86400}d" if duration_seconds >= 86400 else \
-                             f"{duration_seconds // 3600}h" if duration_seconds >= 3600 else \
-                             f"{duration_seconds // 60}m"
-            embed.add_field(name="Expires At", value=f"{duration_display} from creation", inline=True)
-            
-        embed.add_field(name="⚠️ Important", value="Store this key securely; it cannot be retrieved again!", inline=False)
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        duration_display = f"{duration_seconds // 86400}d" if duration_seconds >= 86400 else \
+                         f"{duration_seconds // 3600}h" if duration_seconds >= 3600 else \
+                         f"{duration_seconds // 60}m"
+        embed = build_created_key_embed("premium_key_created", key_data['data']['premiumKey'], f"{duration_display} from creation")
+        await send_embed(interaction, embed, ephemeral=True)
     else:
-        embed = discord.Embed(title="❌ Failed to Create Premium Key", description="Failed to create premium key. Please try again later.", color=0xff0000, timestamp=datetime.utcnow())
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        embed = RESPONSES["create_premium_key_failed"].render()
+        await send_embed(interaction, embed, ephemeral=True)
+
+@bot.tree.command(name="bulkcreatekeys", description="Creates many keys at once for administrators only")
+@commands.has_permissions(administrator=True)
+async def bulkcreatekeys(interaction: discord.Interaction, count: int, duration: str, key_type: Literal["default", "premium"] = "default"):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True)
+    duration_seconds = parse_duration(duration)
+    if duration_seconds is None:
+        embed = RESPONSES["invalid_duration"].render()
+        await send_embed(interaction, embed, ephemeral=True)
+        return
+    if not 1 <= count <= BULK_CREATE_MAX:
+        embed = RESPONSES["invalid_count"].render()
+        await send_embed(interaction, embed, ephemeral=True)
+        return
+    created, failed, unconfirmed = await create_keys_bulk(count, duration_seconds, key_type)
+    if not created:
+        embed = RESPONSES["create_keys_failed"].render()
+        if unconfirmed:
+            embed.add_field(name="⚠️ Unconfirmed", value=UNCONFIRMED_KEYS_NOTE.format(count=unconfirmed), inline=False)
+        await send_embed(interaction, embed, ephemeral=True)
+        return
+    size_limit = interaction.guild.filesize_limit if interaction.guild else discord.utils.DEFAULT_FILE_SIZE_LIMIT_BYTES
+    export_file, compressed, _ = await asyncio.to_thread(write_key_export, created, "csv", size_limit)
+    try:
+        filename = f"{key_type}_keys_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv" + (".gz" if compressed else "")
+        file = discord.File(export_file, filename=filename)
+        embed = RESPONSES["keys_created"].render(count=len(created), key_type=key_type)
+        embed.add_field(name="Created", value=f"{len(created)}", inline=True)
+        embed.add_field(name="Failed", value=f"{failed}", inline=True)
+        embed.add_field(name="Duration", value=f"`{duration}`", inline=True)
+        if unconfirmed:
+            embed.add_field(name="⚠️ Unconfirmed", value=UNCONFIRMED_KEYS_NOTE.format(count=unconfirmed), inline=False)
+        embed.add_field(name="⚠️ Important", value="Store these keys securely; they cannot be retrieved again!", inline=False)
+        await send_embed(interaction, embed, file=file, ephemeral=True)
+    finally:
+        export_file.close()
 
 @bot.tree.command(name="attachdiscordid", description="Attaches a Discord User ID to a Premium Key ID")
 @commands.has_permissions(administrator=True)
+@app_commands.autocomplete(key_id=key_id_autocomplete)
 async def attachdiscordid(interaction: discord.Interaction, key_id: str, discord_id: str):
     if not interaction.user.guild_permissions.administrator:
         await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
@@ -586,56 +2287,49 @@ async def attachdiscordid(interaction: discord.Interaction, key_id: str, discord
     await interaction.response.defer(ephemeral=True)
     
     if not discord_id.isdigit():
-        embed = discord.Embed(title="❌ Invalid Discord ID", description="The Discord ID must be a numeric value.", color=0xff0000, timestamp=datetime.utcnow())
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        embed = RESPONSES["invalid_discord_id"].render()
+        await send_embed(interaction, embed, ephemeral=True)
         return
 
-    key_info = get_premium_key_details(key_id)
+    key_info = await get_premium_key_details(key_id)
     if not key_info:
-        embed = discord.Embed(title="❌ Invalid Key ID", description=f"Could not verify key ID `{key_id.strip()}`. Ensure it is a valid Premium Key.", color=0xff0000, timestamp=datetime.utcnow())
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        embed = RESPONSES["invalid_premium_key_id"].render(key_id=key_id.strip())
+        await send_embed(interaction, embed, ephemeral=True)
         return
 
-    success = attach_discord_id(key_id.strip(), discord_id.strip())
+    success = await attach_discord_id(key_id.strip(), discord_id.strip())
     
     if success:
-        embed = discord.Embed(title="🔗 Discord ID Attached Successfully!", description="The Discord ID has been linked to the Premium Key.", color=0x00ff00, timestamp=datetime.utcnow())
+        embed = RESPONSES["discord_id_attached"].render()
         embed.add_field(name="Key ID", value=f"`{key_id.strip()}`", inline=False)
         embed.add_field(name="Discord ID", value=f"`{discord_id.strip()}`", inline=True)
         embed.add_field(name="Status", value="✅ Attachment complete", inline=True)
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        await send_embed(interaction, embed, ephemeral=True)
     else:
-        embed = discord.Embed(title="❌ Failed to Attach Discord ID", 
-                              description=f"Could not attach Discord ID to key `{key_id.strip()}`. "
-                                          f"Ensure the Key ID is correct and is a **Premium Key**.", 
-                              color=0xff0000, timestamp=datetime.utcnow())
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        embed = RESPONSES["attach_discord_id_failed"].render(key_id=key_id.strip())
+        await send_embed(interaction, embed, ephemeral=True)
 
 @bot.tree.command(name="resethwid", description="Resets HWID for a key to empty for administrators only")
 @commands.has_permissions(administrator=True)
+@app_commands.autocomplete(key_id=key_id_autocomplete)
 async def resethwid(interaction: discord.Interaction, key_id: str):
     if not interaction.user.guild_permissions.administrator:
         await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
         return
     await interaction.response.defer(ephemeral=True)
-    success = change_key_hwid(key_id.strip())
+    success = await change_key_hwid(key_id.strip())
     if success:
-        embed = discord.Embed(title="🔄 HWID Reset Successfully!", description=f"The HWID for key ID `{key_id.strip()}` has been reset to empty.", color=0x00ff00, timestamp=datetime.utcnow())
+        embed = RESPONSES["hwid_reset"].render(key_id=key_id.strip())
         embed.add_field(name="Key ID", value=f"`{key_id.strip()}`", inline=False)
         embed.add_field(name="Status", value="✅ Reset complete", inline=True)
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        await send_embed(interaction, embed, ephemeral=True)
     else:
-        embed = discord.Embed(title="❌ Failed to Reset HWID", description=f"Could not reset HWID for key ID `{key_id.strip()}`. Check the key ID and try again.", color=0xff0000, timestamp=datetime.utcnow())
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        embed = RESPONSES["hwid_reset_failed"].render(key_id=key_id.strip())
+        await send_embed(interaction, embed, ephemeral=True)
 
 @bot.tree.command(name="blacklistkey", description="Blacklists a key for administrators only")
 @commands.has_permissions(administrator=True)
+@app_commands.autocomplete(key_id=key_id_autocomplete)
 async def blacklistkey(interaction: discord.Interaction, key_id: str, duration: str = "7d", reason: str = "No reason provided"):
     if not interaction.user.guild_permissions.administrator:
         await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
@@ -644,70 +2338,99 @@ async def blacklistkey(interaction: discord.Interaction, key_id: str, duration:
     duration_seconds = parse_duration(duration)
     if duration_seconds is None:
         duration_seconds = 604800
-    success = blacklist_key(key_id.strip(), duration_seconds, reason)
+    success = await blacklist_key(key_id.strip(), duration_seconds, reason)
     if success:
-        embed = discord.Embed(title="🚫 Key Blacklisted Successfully!", description=f"The key `{key_id.strip()}` has been blacklisted.", color=0xff0000, timestamp=datetime.utcnow())
+        embed = RESPONSES["key_blacklisted"].render(key_id=key_id.strip())
         embed.add_field(name="Key ID", value=f"`{key_id.strip()}`", inline=False)
         embed.add_field(name="Duration", value=f"`{duration}`", inline=True)
         embed.add_field(name="Reason", value=f"`{reason}`", inline=True)
         embed.add_field(name="Status", value="✅ Blacklist complete", inline=True)
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        await send_embed(interaction, embed, ephemeral=True)
     else:
-        embed = discord.Embed(title="❌ Failed to Blacklist Key", description=f"Could not blacklist key `{key_id.strip()}`. Check the key ID and try again.", color=0xff0000, timestamp=datetime.utcnow())
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        embed = RESPONSES["blacklist_failed"].render(key_id=key_id.strip())
+        await send_embed(interaction, embed, ephemeral=True)
 
 @bot.tree.command(name="whitelistkey", description="Whitelists (unbans) a key for administrators only")
 @commands.has_permissions(administrator=True)
+@app_commands.autocomplete(key_id=key_id_autocomplete)
 async def whitelistkey(interaction: discord.Interaction, key_id: str, reason: str = "No reason provided"):
     if not interaction.user.guild_permissions.administrator:
         await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
         return
     await interaction.response.defer(ephemeral=True)
-    success = whitelist_key(key_id.strip(), reason)
+    success = await whitelist_key(key_id.strip(), reason)
     if success:
-        embed = discord.Embed(title="✅ Key Whitelisted Successfully!", description=f"The key `{key_id.strip()}` has been whitelisted.", color=0x00ff00, timestamp=datetime.utcnow())
+        embed = RESPONSES["key_whitelisted"].render(key_id=key_id.strip())
         embed.add_field(name="Key ID", value=f"`{key_id.strip()}`", inline=False)
         embed.add_field(name="Reason", value=f"`{reason}`", inline=True)
         embed.add_field(name="Status", value="✅ Whitelist complete", inline=True)
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        await send_embed(interaction, embed, ephemeral=True)
     else:
-        embed = discord.Embed(title="❌ Failed to Whitelist Key", description=f"Could not whitelist key `{key_id.strip()}`. Check the key ID and try again.", color=0xff0000, timestamp=datetime.utcnow())
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        embed = RESPONSES["whitelist_failed"].render(key_id=key_id.strip())
+        await send_embed(interaction, embed, ephemeral=True)
+
+@bot.tree.command(name="bulkblacklist", description="Blacklists many keys at once for administrators only")
+@commands.has_permissions(administrator=True)
+async def bulkblacklist(interaction: discord.Interaction, key_ids: Optional[str] = None, file: Optional[discord.Attachment] = None,
+                        duration: str = "7d", reason: str = "No reason provided"):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True)
+    duration_seconds = parse_duration(duration)
+    if duration_seconds is None:
+        duration_seconds = 604800
+    await bulk_key_command(interaction, "blacklist", key_ids, file, {"duration_seconds": duration_seconds, "reason": reason})
+
+@bot.tree.command(name="bulkwhitelist", description="Whitelists (unbans) many keys at once for administrators only")
+@commands.has_permissions(administrator=True)
+async def bulkwhitelist(interaction: discord.Interaction, key_ids: Optional[str] = None, file: Optional[discord.Attachment] = None,
+                        reason: str = "No reason provided"):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True)
+    await bulk_key_command(interaction, "whitelist", key_ids, file, {"reason": reason})
+
+@bot.tree.command(name="bulkresethwid", description="Resets the HWID of many keys at once for administrators only")
+@commands.has_permissions(administrator=True)
+async def bulkresethwid(interaction: discord.Interaction, key_ids: Optional[str] = None, file: Optional[discord.Attachment] = None):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True)
+    await bulk_key_command(interaction, "resethwid", key_ids, file)
 
 @bot.tree.command(name="getdefaultkeyid", description="Retrieves the Key ID for a given key name")
 @commands.has_permissions(administrator=True)
+@app_commands.autocomplete(key_name=key_name_autocomplete)
 async def getdefaultkeyid(interaction: discord.Interaction, key_name: str):
     if not interaction.user.guild_permissions.administrator:
         await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
         return
     await interaction.response.defer(ephemeral=True)
-    key_info = get_key_data_by_name(key_name.strip())
+    key_info = await get_key_data_by_name(key_name.strip())
     if key_info and key_info.get("id"):
-        embed = discord.Embed(title="✅ Key ID Found!", description="The Key ID for the provided key name.", color=0x00ff00, timestamp=datetime.utcnow())
+        embed = RESPONSES["key_id_found"].render()
         embed.add_field(name="Key Name", value=f"`{key_name.strip()}`", inline=False)
         embed.add_field(name="Key ID", value=f"`{key_info['id']}`", inline=False)
         embed.add_field(name="Status", value="✅ ID retrieved", inline=True)
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        await send_embed(interaction, embed, ephemeral=True)
     else:
-        embed = discord.Embed(title="❌ Key ID Not Found", description=f"Could not find Key ID for key name `{key_name.strip()}`.", color=0xff0000, timestamp=datetime.utcnow())
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        embed = RESPONSES["key_id_not_found"].render(key_name=key_name.strip())
+        await send_embed(interaction, embed, ephemeral=True)
 
 @bot.tree.command(name="getkeyinfo", description="Retrieves detailed information for a given key name")
 @commands.has_permissions(administrator=True)
+@app_commands.autocomplete(key_name=key_name_autocomplete)
 async def getkeyinfo(interaction: discord.Interaction, key_name: str):
     if not interaction.user.guild_permissions.administrator:
         await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
         return
     await interaction.response.defer(ephemeral=True)
-    key_info = get_key_data_by_name(key_name.strip())
+    key_info = await get_key_data_by_name(key_name.strip())
     if key_info:
-        embed = discord.Embed(title="✅ Key Information Found!", description="Detailed information for the provided key.", color=0x00ff00, timestamp=datetime.utcnow())
+        embed = RESPONSES["key_info_found"].render()
         embed.add_field(name="Key Name", value=f"`{key_info.get('key', 'N/A')}`", inline=False)
         embed.add_field(name="Key ID", value=f"`{key_info.get('id', 'N/A')}`", inline=False)
         embed.add_field(name="Service ID", value=f"`{key_info.get('serviceId', 'N/A')}`", inline=True)
@@ -720,98 +2443,517 @@ async def getkeyinfo(interaction: discord.Interaction, key_name: str):
         embed.add_field(name="Created At", value=f"`{key_info.get('createdAt', 'N/A')}`", inline=True)
         embed.add_field(name="Blacklisted", value=f"`{'Yes' if key_info.get('isBlacklisted') else 'No'}`", inline=True)
         embed.add_field(name="Status", value="✅ Information retrieved", inline=True)
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        await send_embed(interaction, embed, ephemeral=True)
     else:
-        embed = discord.Embed(title="❌ Key Information Not Found", description=f"Could not find information for key name `{key_name.strip()}`.", color=0xff0000, timestamp=datetime.utcnow())
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        embed = RESPONSES["key_info_not_found"].render(key_name=key_name.strip())
+        await send_embed(interaction, embed, ephemeral=True)
 
 @bot.tree.command(name="iskeyexpired", description="Checks if a key is expired by its Key ID")
 @commands.has_permissions(administrator=True)
+@app_commands.autocomplete(key_id=key_id_autocomplete)
 async def iskeyexpired(interaction: discord.Interaction, key_id: str):
     if not interaction.user.guild_permissions.administrator:
         await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
         return
     await interaction.response.defer(ephemeral=True)
-    key_info = get_key_details(key_id.strip())
+    key_info = await get_key_details(key_id.strip())
     if key_info:
         status_text = check_key_expiration(key_info)
-        embed = discord.Embed(title="✅ Key Status Checked!", description=f"The status of the key `{key_id.strip()}`.", color=0x00ff00, timestamp=datetime.utcnow())
+        embed = RESPONSES["key_status_checked"].render(key_id=key_id.strip())
         embed.add_field(name="Key ID", value=f"`{key_id.strip()}`", inline=False)
         embed.add_field(name="Status", value=f"`{status_text}`", inline=True)
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        await send_embed(interaction, embed, ephemeral=True)
     else:
-        embed = discord.Embed(title="❌ Key Not Found", description=f"Could not find key `{key_id.strip()}`.", color=0xff0000, timestamp=datetime.utcnow())
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        embed = RESPONSES["key_not_found"].render(key_id=key_id.strip())
+        await send_embed(interaction, embed, ephemeral=True)
+
+def format_expiry_lines(key_ids: List[str], limit: int = 1024) -> str:
+    lines: List[str] = []
+    length = 0
+    for index, key_id in enumerate(key_ids):
+        record = expiry_index.get(key_id)
+        line = f"`{record.get('key') or key_id}` <t:{record['expiresTs']}:R>"
+        more = f"... and {len(key_ids) - index} more"
+        if length + len(line) + len(more) + 2 > limit:
+            lines.append(more)
+            break
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines) or "None"
 
-@bot.tree.command(name="downloaddefaultkeys", description="Downloads all default keys to a text file")
+@bot.tree.command(name="expiringkeys", description="Lists known keys that expire within the given number of hours")
 @commands.has_permissions(administrator=True)
-async def downloaddefaultkeys(interaction: discord.Interaction):
+async def expiringkeys(interaction: discord.Interaction, hours: int = 24):
     if not interaction.user.guild_permissions.administrator:
         await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
         return
     await interaction.response.defer(ephemeral=True)
-    success = download_default_keys()
-    if success:
-        file = discord.File("default_keys_dump.txt", filename=f"default_keys_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.txt")
-        embed = discord.Embed(title="✅ Default Keys Downloaded!", description="All default keys have been downloaded to a text file.", color=0x00ff00, timestamp=datetime.utcnow())
-        embed.add_field(name="Status", value="✅ File generated", inline=True)
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, file=file, ephemeral=True)
-    else:
-        embed = discord.Embed(title="❌ Failed to Download Keys", description="Could not retrieve default keys. Please try again later.", color=0xff0000, timestamp=datetime.utcnow())
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+    now = time.time()
+    key_ids = expiry_index.between(now, now + max(0, hours) * 3600)
+    embed = RESPONSES["expiring_keys"].render(count=len(key_ids), hours=hours)
+    embed.add_field(name="Keys", value=format_expiry_lines(key_ids), inline=False)
+    if len(key_ids) <= 20:
+        await send_embed(interaction, embed, ephemeral=True)
+        return
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["id", "key", "expiredAt", "discordId"])
+    for key_id in key_ids:
+        record = expiry_index.get(key_id)
+        writer.writerow([key_id, record.get("key", ""), record["expiresTs"], record.get("discordId") or ""])
+    file_buffer = io.BytesIO(buffer.getvalue().encode("utf-8"))
+    file = discord.File(file_buffer, filename=f"expiring_keys_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv")
+    await send_embed(interaction, embed, file=file, ephemeral=True)
+    file_buffer.close()
+
+async def send_user_keys(interaction: discord.Interaction, user: discord.abc.User) -> None:
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True)
+    await premium_key_index.ensure_fresh()
+    key_ids = discord_key_index.get(user.id)
+    if not key_ids:
+        embed = RESPONSES["no_user_keys"].render(user=user.mention)
+        await send_embed(interaction, embed, ephemeral=True)
+        return
+    lines: List[str] = []
+    length = 0
+    for index, key_id in enumerate(key_ids):
+        record = expiry_index.get(key_id)
+        expires = f"<t:{record['expiresTs']}:R>" if record["expiresTs"] else "Never"
+        line = f"`{key_id}` · {record.get('key') or 'N/A'} · expires {expires}"
+        if length + len(line) + 32 > 1024:
+            lines.append(f"... and {len(key_ids) - index} more")
+            break
+        lines.append(line)
+        length += len(line) + 1
+    embed = RESPONSES["user_keys_found"].render(count=len(key_ids), user=user.mention)
+    embed.add_field(name="Keys", value="\n".join(lines), inline=False)
+    await send_embed(interaction, embed, ephemeral=True)
+
+@bot.tree.command(name="keysforuser", description="Lists the premium keys attached to a Discord user")
+@commands.has_permissions(administrator=True)
+async def keysforuser(interaction: discord.Interaction, member: discord.User):
+    await send_user_keys(interaction, member)
+
+@bot.tree.context_menu(name="AuthGuard Keys")
+async def keys_for_user_menu(interaction: discord.Interaction, member: discord.User):
+    await send_user_keys(interaction, member)
+
+def format_search_lines(matches: List[Tuple[str, Dict[str, Any]]], limit: int = 1024) -> str:
+    lines: List[str] = []
+    length = 0
+    for index, (kind, key_data) in enumerate(matches):
+        expires_ts = to_unix_seconds(key_data.get("expiredAt"))
+        line = f"`{key_data.get('key') or key_data.get('id')}` · {kind} · " + (f"expires <t:{expires_ts}:R>" if expires_ts else "never expires")
+        more = f"... and {len(matches) - index} more"
+        if length + len(line) + len(more) + 2 > limit:
+            lines.append(more)
+            break
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines) or "None"
+
+def render_search_csv(matches: List[Tuple[str, Dict[str, Any]]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["type"] + EXPORT_FIELDS + ["note"])
+    writer.writerows([kind] + [key_data.get(field, "") for field in EXPORT_FIELDS] + [key_data.get("note") or ""] for kind, key_data in matches)
+    return buffer.getvalue().encode("utf-8")
+
+@bot.tree.command(name="searchkeys", description="Searches the locally synced keys with filters")
+@app_commands.describe(expired="Only expired (True) or only unexpired (False) keys",
+                       expires_within="Only keys expiring within this duration, e.g. 7d",
+                       created_within="Only keys created within this duration, e.g. 7d",
+                       note="Text the key's note must contain")
+@commands.has_permissions(administrator=True)
+async def searchkeys(interaction: discord.Interaction, key_type: Literal["all", "default", "premium"] = "all",
+                     expired: Optional[bool] = None, expires_within: Optional[str] = None, created_within: Optional[str] = None,
+                     has_hwid: Optional[bool] = None, has_ip: Optional[bool] = None, blacklisted: Optional[bool] = None,
+                     has_discord_id: Optional[bool] = None, discord_id: Optional[str] = None, note: Optional[str] = None):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True)
+    now = int(time.time())
+    conditions: List[Tuple[str, str, Any]] = []
+    for value, field, op in ((expires_within, "expiredAt", "le"), (created_within, "createdAt", "ge")):
+        if value is None:
+            continue
+        duration_seconds = parse_duration(value)
+        if duration_seconds is None:
+            embed = RESPONSES["invalid_duration"].render()
+            await send_embed(interaction, embed, ephemeral=True)
+            return
+        conditions.append((field, op, now + duration_seconds if op == "le" else now - duration_seconds))
+    if expires_within is not None:
+        conditions.append(("expiredAt", "gt", now))
+    if key_type != "all":
+        conditions.append(("kind", "eq", key_type))
+    if expired is not None:
+        conditions.append(("expiredAt", "le" if expired else "gt", now))
+    for value, field in ((has_hwid, "hwid"), (has_ip, "ip"), (blacklisted, "isBlacklisted")):
+        if value is not None:
+            conditions.append((field, "eq", value))
+    if has_discord_id is not None:
+        conditions.append(("discordId", "ne" if has_discord_id else "eq", ""))
+    if discord_id:
+        conditions.append(("discordId", "eq", discord_id.strip()))
+    if note:
+        conditions.append(("note", "contains", note.strip().lower()))
+    await asyncio.gather(*(index.ensure_fresh() for _, index in key_snapshot.indexes))
+    started_at = time.perf_counter()
+    await key_snapshot.refresh()
+    matches = key_snapshot.search(conditions)
+    elapsed = time.perf_counter() - started_at
+    embed = RESPONSES["search_results"].render(count=len(matches), total=len(key_snapshot.records), ms=f"{elapsed * 1000:.1f}")
+    embed.add_field(name="Keys", value=format_search_lines(matches), inline=False)
+    if len(matches) <= 20:
+        await send_embed(interaction, embed, ephemeral=True)
+        return
+    file_buffer = io.BytesIO(await asyncio.to_thread(render_search_csv, matches))
+    file = discord.File(file_buffer, filename=f"key_search_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv")
+    await send_embed(interaction, embed, file=file, ephemeral=True)
+    file_buffer.close()
+
+def format_day(day: int) -> str:
+    return datetime.fromtimestamp(day * 86400, tz=timezone.utc).strftime("%m-%d")
+
+def format_histogram(buckets: List[Tuple[int, int]], width: int = 12) -> str:
+    peak = max((count for _, count in buckets), default=0) or 1
+    return "```\n" + "\n".join(f"{format_day(day)} {'█' * round(count / peak * width):<{width}} {count}" for day, count in buckets) + "\n```"
+
+def render_key_stats_chart(summary: Dict[str, Any]) -> bytes:
+    figure = Figure(figsize=(10, 4), dpi=100)
+    created_axes, expiring_axes = figure.subplots(1, 2)
+    for axes, field, title, color in ((created_axes, "created", "Keys created per day", "#00b050"),
+                                      (expiring_axes, "expiring", "Keys expiring per day", "#ffa500")):
+        buckets = summary[field]
+        axes.bar([format_day(day) for day, _ in buckets], [count for _, count in buckets], color=color)
+        axes.set_title(title)
+        axes.tick_params(axis="x", labelrotation=60, labelsize=8)
+    figure.tight_layout()
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+@bot.tree.command(name="keystats", description="Shows statistics about the locally synced keys")
+@commands.has_permissions(administrator=True)
+async def keystats(interaction: discord.Interaction, chart: bool = False):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True)
+    await asyncio.gather(*(index.ensure_fresh() for _, index in key_snapshot.indexes))
+    summary = key_stats.summary(KEY_STATS_DAYS)
+    embed = RESPONSES["key_stats"].render()
+    for name, field in (("Total", "total"), ("Active", "active"), ("Expired", "expired"), ("Blacklisted", "blacklisted"),
+                        ("HWID Bound", "hwid"), ("Premium", "premium"), ("Default", "default")):
+        embed.add_field(name=name, value=f"{summary[field]}", inline=True)
+    if not chart:
+        embed.add_field(name="Created Per Day", value=format_histogram(summary["created"]), inline=False)
+        embed.add_field(name="Expiring Per Day", value=format_histogram(summary["expiring"]), inline=False)
+        await send_embed(interaction, embed, ephemeral=True)
+        return
+    if Figure is None:
+        embed.add_field(name="⚠️ Note", value="Charts need matplotlib (`pip install matplotlib`).", inline=False)
+        await send_embed(interaction, embed, ephemeral=True)
+        return
+    file = discord.File(io.BytesIO(await asyncio.to_thread(render_key_stats_chart, summary)), filename="keystats.png")
+    embed.set_image(url="attachment://keystats.png")
+    await send_embed(interaction, embed, file=file, ephemeral=True)
+
+@bot.tree.command(name="downloaddefaultkeys", description="Downloads all default keys to a txt, jsonl or csv file")
+@commands.has_permissions(administrator=True)
+async def downloaddefaultkeys(interaction: discord.Interaction, file_format: Literal["txt", "jsonl", "csv"] = "txt"):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True)
+    size_limit = interaction.guild.filesize_limit if interaction.guild else discord.utils.DEFAULT_FILE_SIZE_LIMIT_BYTES
+    await submit_job(interaction, "export", {"file_format": file_format, "size_limit": size_limit}, 1,
+                     RESPONSES["export_queued"].render(file_format=file_format))
+
+@bot.tree.command(name="jobs", description="Lists the most recent background jobs")
+@commands.has_permissions(administrator=True)
+async def jobs(interaction: discord.Interaction):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True)
+    recent = await job_queue.call(job_queue.recent, JOB_LIST_LIMIT)
+    embed = RESPONSES["jobs_list"].render(count=len(recent))
+    if recent:
+        lines = [f"`#{job['id']}` {job['kind']} · {JOB_STATE_LABELS.get(job['state'], job['state'])} · {job['done']}/{job['total']} · <t:{int(job['created_at'])}:R>"
+                 for job in recent]
+        embed.add_field(name="Jobs", value="\n".join(lines), inline=False)
+    await send_embed(interaction, embed, ephemeral=True)
+
+@bot.tree.command(name="jobstatus", description="Shows the progress of a background job")
+@commands.has_permissions(administrator=True)
+async def jobstatus(interaction: discord.Interaction, job_id: int):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True)
+    job = await job_queue.call(job_queue.get, job_id)
+    if not job:
+        embed = RESPONSES["job_not_found"].render(job_id=job_id)
+        await send_embed(interaction, embed, ephemeral=True)
+        return
+    embed = RESPONSES["job_status"].render(job_id=job_id)
+    embed.add_field(name="Kind", value=f"`{job['kind']}`", inline=True)
+    embed.add_field(name="State", value=JOB_STATE_LABELS.get(job["state"], job["state"]), inline=True)
+    embed.add_field(name="Progress", value=f"{job['done']}/{job['total']}", inline=True)
+    embed.add_field(name="Requested By", value=f"<@{job['user_id']}>", inline=True)
+    embed.add_field(name="Created", value=f"<t:{int(job['created_at'])}:R>", inline=True)
+    embed.add_field(name="Updated", value=f"<t:{int(job['updated_at'])}:R>", inline=True)
+    if job["error"]:
+        embed.add_field(name="Error", value=f"`{job['error'][:1000]}`", inline=False)
+    await send_embed(interaction, embed, ephemeral=True)
 
 @bot.tree.command(name="addnotetopremiumkey", description="Adds a note to a premium key")
 @commands.has_permissions(administrator=True)
+@app_commands.autocomplete(key_id=key_id_autocomplete)
 async def addnotetopremiumkey(interaction: discord.Interaction, key_id: str, note: str):
     if not interaction.user.guild_permissions.administrator:
         await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
         return
     await interaction.response.defer(ephemeral=True)
     
-    key_info = get_premium_key_details(key_id)
+    key_info = await get_premium_key_details(key_id)
     if not key_info:
-        embed = discord.Embed(title="❌ Invalid Key ID", description=f"Could not verify key ID `{key_id.strip()}`. Ensure it is a valid Premium Key.", color=0xff0000, timestamp=datetime.utcnow())
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        embed = RESPONSES["invalid_premium_key_id"].render(key_id=key_id.strip())
+        await send_embed(interaction, embed, ephemeral=True)
         return
 
-    success = add_note_to_premium_key(key_id.strip(), note.strip())
+    success = await add_note_to_premium_key(key_id.strip(), note.strip())
     
     if success:
-        embed = discord.Embed(title="✅ Note Added Successfully!", description="The note has been added to the Premium Key.", color=0x00ff00, timestamp=datetime.utcnow())
+        embed = RESPONSES["note_added"].render()
         embed.add_field(name="Key ID", value=f"`{key_id.strip()}`", inline=False)
         embed.add_field(name="Note", value=f"`{note.strip()}`", inline=True)
         embed.add_field(name="Status", value="✅ Note added", inline=True)
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        await send_embed(interaction, embed, ephemeral=True)
     else:
-        embed = discord.Embed(title="❌ Failed to Add Note", description=f"Could not add note to key `{key_id.strip()}`. Ensure the Key ID is correct and is a **Premium Key**.", color=0xff0000, timestamp=datetime.utcnow())
-        embed.set_footer(text=CRAVEX_PROMO_LINK)
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        embed = RESPONSES["add_note_failed"].render(key_id=key_id.strip())
+        await send_embed(interaction, embed, ephemeral=True)
+
+@bot.tree.command(name="auditlog", description="Lists recorded key changes for administrators only")
+@commands.has_permissions(administrator=True)
+@app_commands.autocomplete(key_id=key_id_autocomplete)
+async def auditlog(interaction: discord.Interaction, key_id: Optional[str] = None, user: Optional[discord.User] = None,
+                   since: Optional[str] = None, until: Optional[str] = None, limit: app_commands.Range[int, 1, AUDIT_LIST_LIMIT] = 10):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("You need Administrator permissions to use this command.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True)
+    since_seconds = parse_duration(since) if since else None
+    until_seconds = parse_duration(until) if until else None
+    if (since and since_seconds is None) or (until and until_seconds is None):
+        embed = RESPONSES["invalid_duration"].render()
+        await send_embed(interaction, embed, ephemeral=True)
+        return
+    await audit_log.flush()
+    now = time.time()
+    events = audit_log.query(key_id.strip() if key_id else None, user.id if user else None,
+                             now - since_seconds if since_seconds else None, limit, now - until_seconds if until_seconds else None)
+    embed = RESPONSES["audit_log"].render(count=len(events))
+    if events:
+        embed.add_field(name="Events", value=format_audit_lines(events), inline=False)
+    await send_embed(interaction, embed, ephemeral=True)
+
+def format_audit_lines(events: List[Dict[str, Any]], limit: int = 1024) -> str:
+    lines: List[str] = []
+    length = 0
+    for index, event in enumerate(events):
+        line = (f"<t:{int(event['created_at'])}:f> {'✅' if event['success'] else '❌'} **{event['action']}** "
+                f"`{event['key_id'] or '-'}`" + (f" by <@{event['user_id']}>" if event["user_id"] else ""))
+        if event["reason"]:
+            line += f" · {event['reason'][:100]}"
+        more = f"... and {len(events) - index} more"
+        if length + len(line) + len(more) + 2 > limit:
+            lines.append(more)
+            break
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+@tasks.loop(seconds=AUDIT_FLUSH_INTERVAL)
+async def flush_audit_log():
+    events = await audit_log.flush()
+    if not AUDIT_CHANNEL_ID or not events:
+        return
+    channel = bot.get_partial_messageable(AUDIT_CHANNEL_ID)
+    embed = RESPONSES["audit_log_batch"].render(count=len(events))
+    embed.add_field(name="Events", value=format_audit_lines(events), inline=False)
+    try:
+        await channel.send(embed=embed)
+    except discord.HTTPException:
+        pass
+
+@tasks.loop(seconds=KEY_INDEX_REFRESH_INTERVAL)
+async def refresh_key_index():
+    await default_key_index.refresh()
+    await premium_key_index.refresh()
+
+@tasks.loop(seconds=BLACKLIST_REFRESH_INTERVAL)
+async def refresh_blacklist_index():
+    await blacklist_index.refresh()
+
+@tasks.loop(seconds=1)
+async def probe_event_loop_lag():
+    started_at = time.perf_counter()
+    await asyncio.sleep(0.5)
+    metrics.set("event_loop_lag_seconds", max(0.0, time.perf_counter() - started_at - 0.5))
+    if SHARDED:
+        for shard_id, latency in bot.latencies:
+            if latency < float("inf"):
+                metrics.set("discord_shard_latency_seconds", latency, {"shard": str(shard_id)})
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8", headers={"X-Content-Type-Options": "nosniff"})
+
+async def start_metrics_server() -> Optional[web.AppRunner]:
+    if not METRICS_PORT:
+        return None
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, METRICS_HOST, METRICS_PORT).start()
+    print(f"Serving metrics on http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+    return runner
+
+metrics_runner: Optional[web.AppRunner] = None
+command_sync_task: Optional["asyncio.Task[None]"] = None
+
+async def notify_key_owners(key_ids: List[str], message: str) -> None:
+    for key_id in key_ids:
+        record = expiry_index.get(key_id)
+        discord_id = record.get("discordId")
+        if not discord_id or not str(discord_id).isdigit():
+            continue
+        try:
+            user = bot.get_user(int(discord_id)) or await bot.fetch_user(int(discord_id))
+            await user.send(message.format(key=record.get("key") or key_id, expires_ts=record["expiresTs"]))
+        except discord.HTTPException:
+            continue
+
+expiry_state: Dict[str, Any] = {"last_scan": time.time(), "warned": {}}
+
+@tasks.loop(seconds=EXPIRY_SCAN_INTERVAL)
+async def scan_expiring_keys():
+    now = time.time()
+    warned: Dict[str, int] = expiry_state["warned"]
+    expired = expiry_index.between(expiry_state["last_scan"], now)
+    expiring = [key_id for key_id in expiry_index.between(now, now + EXPIRY_WARNING_WINDOW)
+                if warned.get(key_id) != expiry_index.expires_at.get(key_id)]
+    expiry_state["last_scan"] = now
+    for key_id in expiring:
+        warned[key_id] = expiry_index.expires_at[key_id]
+    for key_id in expired:
+        warned.pop(key_id, None)
+    channel = bot.get_channel(EXPIRY_CHANNEL_ID) if EXPIRY_CHANNEL_ID else None
+    if channel is not None and (expiring or expired):
+        embed = RESPONSES["expiry_notice"].render()
+        if expiring:
+            embed.add_field(name=f"Expiring Soon ({len(expiring)})", value=format_expiry_lines(expiring), inline=False)
+        if expired:
+            embed.add_field(name=f"Expired ({len(expired)})", value=format_expiry_lines(expired), inline=False)
+        try:
+            await channel.send(embed=embed)
+        except discord.HTTPException:
+            pass
+    if EXPIRY_DM_OWNERS and is_primary_process():
+        await notify_key_owners(expiring, "⏰ Your key `{key}` expires <t:{expires_ts}:R>.")
+        await notify_key_owners(expired, "🔴 Your key `{key}` has expired.")
+
+@tasks.loop(hours=1)
+async def purge_key_cache():
+    key_cache.purge_expired()
+    with contextlib.suppress(sqlite3.Error):
+        await operation_store.call(operation_store.purge, OPERATION_RETENTION)
 
 @bot.event
-async def on_ready():
-    print(f'Logged in as {bot.user} (ID: {bot.user.id})')
+async def setup_hook():
+    global metrics_runner, command_sync_task
+    metrics_runner = await start_metrics_server()
+    probe_event_loop_lag.start()
+    refresh_key_index.start()
+    refresh_blacklist_index.start()
+    purge_key_cache.start()
+    scan_expiring_keys.start()
+    flush_audit_log.start()
+    start_job_workers()
+    if is_primary_process():
+        command_sync_task = asyncio.create_task(sync_command_tree())
+
+@bot.event
+async def on_app_command_completion(interaction: discord.Interaction, command: Any):
+    record_command(interaction, command, "success")
+
+def command_tree_hash(guild: Optional[discord.abc.Snowflake]) -> str:
+    payload = sorted((command.to_dict(bot.tree) for command in bot.tree.get_commands(guild=guild)),
+                     key=lambda command: (command.get("type", 1), command["name"]))
+    return hashlib.sha256(json.dumps([bot.application_id, payload], sort_keys=True).encode("utf-8")).hexdigest()
+
+def load_command_sync_state() -> Dict[str, str]:
+    try:
+        with open(COMMAND_SYNC_PATH, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_command_sync_state(state: Dict[str, str]) -> None:
+    temp_path = COMMAND_SYNC_PATH + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(temp_path, COMMAND_SYNC_PATH)
+
+async def sync_command_tree() -> None:
+    guild = discord.Object(id=DEV_GUILD_ID) if DEV_GUILD_ID else None
+    if guild is not None:
+        bot.tree.copy_global_to(guild=guild)
+    scope = f"guild:{DEV_GUILD_ID}" if guild is not None else "global"
+    tree_hash = command_tree_hash(guild)
+    state = load_command_sync_state()
+    if state.get(scope) == tree_hash:
+        print(f"Application commands unchanged ({scope}), skipping sync.")
+        return
     max_retries = 5
     retry_delay = 5
     for attempt in range(max_retries):
         try:
-            print("Attempting to sync application commands...")
-            synced = await bot.tree.sync()
+            print(f"Attempting to sync application commands ({scope})...")
+            synced = await bot.tree.sync(guild=guild)
             print(f"Successfully synced {len(synced)} command(s).")
-            break
-        except Exception as e:
+            state[scope] = tree_hash
+            save_command_sync_state(state)
+            return
+        except discord.HTTPException as e:
             print(f"Sync attempt {attempt + 1} failed: {e}")
             if attempt < max_retries - 1:
-                await asyncio.sleep(retry_delay)
-            else:
-                raise e
+                await asyncio.sleep(retry_delay * 2 ** attempt)
+
+@bot.event
+async def on_ready():
+    print(f'Logged in as {bot.user} (ID: {bot.user.id})')
+
+async def main():
+    try:
+        async with bot:
+            await bot.start(BOT_TOKEN)
+    finally:
+        await audit_log.flush()
+        await api.close()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
 
 if __name__ == "__main__":
-    bot.run(BOT_TOKEN)
+    discord.utils.setup_logging()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
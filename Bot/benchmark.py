@@ -0,0 +1,198 @@
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+
+from mock_authguard import MockAuthGuard
+
+
+class FakeMessage:
+    async def edit(self, **kwargs) -> None:
+        pass
+
+
+class FakeResponse:
+    def __init__(self):
+        self.done = False
+
+    def is_done(self) -> bool:
+        return self.done
+
+    async def defer(self, **kwargs) -> None:
+        self.done = True
+
+    async def send_message(self, *args, **kwargs) -> None:
+        self.done = True
+
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+
+    async def send(self, *args, **kwargs) -> FakeMessage:
+        self.interaction.sent.append(kwargs)
+        return FakeMessage()
+
+
+class FakeInteraction:
+    def __init__(self, interaction_id: int):
+        self.id = interaction_id
+        self.created_at = datetime.now(timezone.utc)
+        self.extras: Dict[str, Any] = {}
+        self.sent: List[Dict[str, Any]] = []
+        self.user = types.SimpleNamespace(id=1, name="benchmark", mention="<@1>",
+                                          guild_permissions=types.SimpleNamespace(administrator=True))
+        self.guild = types.SimpleNamespace(id=1, filesize_limit=10 * 1024 * 1024)
+        self.guild_id = 1
+        self.channel = None
+        self.channel_id = 1
+        self.response = FakeResponse()
+        self.followup = FakeFollowup(self)
+
+    def failed(self) -> bool:
+        embeds = [kwargs["embed"] for kwargs in self.sent if kwargs.get("embed") is not None]
+        return not embeds or embeds[-1].title.startswith("❌")
+
+
+def load_bot(api_url: str, work_dir: str, overrides: Dict[str, Any]) -> types.ModuleType:
+    config = {
+        "API_TOKEN": "benchmark",
+        "SERVICE_ID": 1,
+        "PROMO_LINK": "benchmark",
+        "BOT_TOKEN": "benchmark",
+        "API_URL": api_url,
+        "METRICS_PORT": 0,
+        "KEY_CACHE_PATH": os.path.join(work_dir, "cache.db"),
+        "JOB_QUEUE_PATH": os.path.join(work_dir, "jobs.db"),
+        "AUDIT_LOG_PATH": os.path.join(work_dir, "audit.db"),
+        **overrides
+    }
+    config_path = os.path.join(work_dir, "data.json")
+    with open(config_path, "w") as f:
+        json.dump(config, f)
+    os.environ["AUTHGUARD_BOT_CONFIG"] = config_path
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    return importlib.import_module("Bot")
+
+
+def build_scenarios(bot_module: types.ModuleType, mock: MockAuthGuard, rng: random.Random) -> Dict[str, Callable[[FakeInteraction], Awaitable[None]]]:
+    default_ids = list(mock.default_keys)
+    hwid_ids = [key_id for key_id, key_data in mock.default_keys.items() if key_data.get("hwid")]
+    names = [key_data["key"] for key_data in mock.default_keys.values()]
+
+    async def blacklist_then_whitelist(interaction: FakeInteraction) -> None:
+        key_id = rng.choice(hwid_ids)
+        await bot_module.blacklistkey.callback(interaction, key_id, "1h", "benchmark")
+        await bot_module.whitelistkey.callback(interaction, key_id, "benchmark")
+
+    return {
+        "iskeyexpired": lambda interaction: bot_module.iskeyexpired.callback(interaction, rng.choice(default_ids)),
+        "getkeyinfo": lambda interaction: bot_module.getkeyinfo.callback(interaction, rng.choice(names)),
+        "getkeysjson": lambda interaction: bot_module.getkeysjson.callback(interaction, " ".join(rng.sample(default_ids, 20))),
+        "createkey": lambda interaction: bot_module.createkey.callback(interaction),
+        "resethwid": lambda interaction: bot_module.resethwid.callback(interaction, rng.choice(default_ids)),
+        "blacklist_whitelist": blacklist_then_whitelist
+    }
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def run_scenario(operation: Callable[[FakeInteraction], Awaitable[None]], operations: int, concurrency: int) -> Dict[str, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def run_one(index: int) -> None:
+        nonlocal failures
+        async with semaphore:
+            interaction = FakeInteraction(index)
+            started_at = time.perf_counter()
+            try:
+                await operation(interaction)
+                failures += interaction.failed()
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(run_one(index) for index in range(operations)))
+    elapsed = time.perf_counter() - started_at
+    return {
+        "ops": operations,
+        "failures": failures,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "ops_per_sec": operations / elapsed if elapsed else 0.0
+    }
+
+
+def parse_override(value: str) -> Any:
+    name, _, raw = value.partition("=")
+    try:
+        return name, json.loads(raw)
+    except json.JSONDecodeError:
+        return name, raw
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the bot's command handlers against a local AuthGuard stand-in")
+    parser.add_argument("--scenarios", nargs="*", default=None, help="scenarios to run (default: all)")
+    parser.add_argument("--operations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--default-keys", type=int, default=1000)
+    parser.add_argument("--premium-keys", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="NAME=VALUE",
+                        help="bot setting to override, e.g. --set KEY_CACHE_TTL=0")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> None:
+    mock = MockAuthGuard(1, args.default_keys, args.premium_keys, args.latency, args.jitter,
+                         args.error_rate, args.throttle_rate, args.retry_after, args.seed)
+    runner = await mock.start(port=args.port)
+    with tempfile.TemporaryDirectory() as work_dir:
+        bot_module = load_bot(f"http://127.0.0.1:{args.port}", work_dir, dict(parse_override(value) for value in args.overrides))
+        try:
+            scenarios = build_scenarios(bot_module, mock, random.Random(args.seed))
+            results: Dict[str, Dict[str, float]] = {}
+            for name in args.scenarios or scenarios:
+                upstream_before = mock.requests
+                results[name] = await run_scenario(scenarios[name], args.operations, args.concurrency)
+                results[name]["upstream_requests"] = mock.requests - upstream_before
+            if args.json:
+                print(json.dumps(results, indent=2))
+            else:
+                print(f"{'scenario':<22}{'ops':>6}{'fail':>6}{'p50 ms':>10}{'p99 ms':>10}{'ops/s':>10}{'upstream':>10}")
+                for name, result in results.items():
+                    print(f"{name:<22}{result['ops']:>6}{result['failures']:>6}{result['p50_ms']:>10.1f}"
+                          f"{result['p99_ms']:>10.1f}{result['ops_per_sec']:>10.1f}{result['upstream_requests']:>10}")
+        finally:
+            await bot_module.api.close()
+            bot_module.key_cache.connection.close()
+            bot_module.job_queue.connection.close()
+            bot_module.audit_log.close()
+            bot_module.operation_store.connection.close()
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
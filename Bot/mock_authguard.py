@@ -0,0 +1,198 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+import uuid
+from typing import Optional, Dict, Any, List
+
+from aiohttp import web
+
+
+class MockAuthGuard:
+    def __init__(self, service_id: int = 1, default_keys: int = 1000, premium_keys: int = 100, latency: float = 0.05,
+                 jitter: float = 0.02, error_rate: float = 0.0, throttle_rate: float = 0.0, retry_after: float = 1.0,
+                 seed: Optional[int] = None):
+        self.service_id = service_id
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.default_keys: Dict[str, Dict[str, Any]] = {}
+        self.premium_keys: Dict[str, Dict[str, Any]] = {}
+        self.blacklist: Dict[str, Dict[str, Any]] = {}
+        for index in range(default_keys):
+            key_data = self.new_key(int(time.time()) + self.random.randint(-7, 30) * 86400)
+            if index % 3 == 0:
+                key_data["hwid"] = uuid.UUID(int=self.random.getrandbits(128)).hex
+            self.default_keys[key_data["id"]] = key_data
+        for _ in range(premium_keys):
+            key_data = self.new_key(int(time.time()) + self.random.randint(1, 365) * 86400)
+            self.premium_keys[key_data["id"]] = key_data
+
+    def new_key(self, expired_at: int) -> Dict[str, Any]:
+        key_id = str(uuid.UUID(int=self.random.getrandbits(128)))
+        return {
+            "id": key_id,
+            "key": f"Cravex::Hub_{key_id.replace('-', '')[:16]}",
+            "serviceId": self.service_id,
+            "createdAt": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+            "expiredAt": expired_at,
+            "hwid": None,
+            "ip": None,
+            "sessionId": None,
+            "discordId": None,
+            "providerId": None,
+            "note": None,
+            "isBlacklisted": False
+        }
+
+    @web.middleware
+    async def simulate(self, request: web.Request, handler) -> web.StreamResponse:
+        self.requests += 1
+        await asyncio.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+        roll = self.random.random()
+        if roll < self.throttle_rate:
+            return web.json_response({"success": False, "statusCode": 429, "message": "Too Many Requests"},
+                                     status=429, headers={"Retry-After": str(self.retry_after)})
+        if roll < self.throttle_rate + self.error_rate:
+            return web.json_response({"success": False, "statusCode": 500, "message": "Internal Server Error"}, status=500)
+        return await handler(request)
+
+    @staticmethod
+    def ok(data: Dict[str, Any], status: int = 200) -> web.Response:
+        return web.json_response({"success": True, "statusCode": status, "data": data}, status=status)
+
+    @staticmethod
+    def not_found() -> web.Response:
+        return web.json_response({"success": False, "statusCode": 404, "message": "Not Found"}, status=404)
+
+    @staticmethod
+    def list_response(request: web.Request, field: str, keys: Dict[str, Dict[str, Any]]) -> web.Response:
+        items = list(keys.values())
+        if "limit" in request.query:
+            limit = max(1, int(request.query["limit"]))
+            page = max(1, int(request.query.get("page", 1)))
+            items = items[(page - 1) * limit:page * limit]
+        text = json.dumps({"success": True, "statusCode": 200, "data": {field: items}})
+        etag = f'"{hashlib.sha1(text.encode()).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(text=text, content_type="application/json", headers={"ETag": etag})
+
+    async def list_default_keys(self, request: web.Request) -> web.Response:
+        return self.list_response(request, "defaultKeys", self.default_keys)
+
+    async def list_premium_keys(self, request: web.Request) -> web.Response:
+        return self.list_response(request, "premiumKeys", self.premium_keys)
+
+    async def create_default_key(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        key_data = self.new_key(body.get("expiredAt", int(time.time()) + 86400))
+        self.default_keys[key_data["id"]] = key_data
+        return self.ok({"defaultKey": key_data}, status=201)
+
+    async def create_premium_key(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        key_data = self.new_key(body.get("expiredAt", int(time.time()) + 86400))
+        self.premium_keys[key_data["id"]] = key_data
+        return self.ok({"premiumKey": key_data}, status=201)
+
+    async def get_default_key(self, request: web.Request) -> web.Response:
+        key_data = self.default_keys.get(request.match_info["key_id"])
+        return self.ok({"defaultKey": key_data}) if key_data else self.not_found()
+
+    async def get_premium_key(self, request: web.Request) -> web.Response:
+        key_data = self.premium_keys.get(request.match_info["key_id"])
+        return self.ok({"premiumKey": key_data}) if key_data else self.not_found()
+
+    async def get_service_key(self, request: web.Request) -> web.Response:
+        key_id = request.match_info["key_id"]
+        key_data = self.default_keys.get(key_id) or self.premium_keys.get(key_id)
+        return self.ok(key_data) if key_data else self.not_found()
+
+    async def patch_default_key(self, request: web.Request) -> web.Response:
+        key_data = self.default_keys.get(request.match_info["key_id"])
+        if not key_data:
+            return self.not_found()
+        key_data.update(await request.json())
+        return self.ok({"defaultKey": key_data})
+
+    async def patch_premium_key(self, request: web.Request) -> web.Response:
+        key_data = self.premium_keys.get(request.match_info["key_id"])
+        if not key_data:
+            return self.not_found()
+        key_data.update(await request.json())
+        return self.ok({"premiumKey": key_data})
+
+    async def list_blacklist(self, request: web.Request) -> web.Response:
+        hwid = request.query.get("hwid")
+        entries: List[Dict[str, Any]] = [entry for entry in self.blacklist.values() if not hwid or entry["hwid"] == hwid]
+        return self.ok({"blacklist": entries})
+
+    async def create_blacklist_entry(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        entry = {**body, "id": str(uuid.UUID(int=self.random.getrandbits(128))), "serviceId": self.service_id}
+        self.blacklist[entry["id"]] = entry
+        for key_data in self.default_keys.values():
+            if entry.get("hwid") and key_data.get("hwid") == entry["hwid"]:
+                key_data["isBlacklisted"] = True
+        return self.ok({"blacklist": entry}, status=201)
+
+    async def delete_blacklist_entry(self, request: web.Request) -> web.Response:
+        entry = self.blacklist.pop(request.match_info["entry_id"], None)
+        if not entry:
+            return self.not_found()
+        for key_data in self.default_keys.values():
+            if entry.get("hwid") and key_data.get("hwid") == entry["hwid"]:
+                key_data["isBlacklisted"] = False
+        return self.ok({})
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self.simulate])
+        app.router.add_get("/key-manager/default-key", self.list_default_keys)
+        app.router.add_post("/key-manager/default-key", self.create_default_key)
+        app.router.add_get("/key-manager/default-key/{key_id}", self.get_default_key)
+        app.router.add_patch("/key-manager/default-key/{key_id}", self.patch_default_key)
+        app.router.add_get("/key-manager/premium-key", self.list_premium_keys)
+        app.router.add_post("/key-manager/premium-key", self.create_premium_key)
+        app.router.add_get("/key-manager/premium-key/{key_id}", self.get_premium_key)
+        app.router.add_patch("/key-manager/premium-key/{key_id}", self.patch_premium_key)
+        app.router.add_get("/key-manager/service/{service_id}/key/{key_id}", self.get_service_key)
+        app.router.add_get("/key-manager/blacklist", self.list_blacklist)
+        app.router.add_post("/key-manager/blacklist", self.create_blacklist_entry)
+        app.router.add_delete("/key-manager/blacklist/{entry_id}", self.delete_blacklist_entry)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> web.AppRunner:
+        runner = web.AppRunner(self.create_app(), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        return runner
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local stand-in for the AuthGuard key manager API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--service-id", type=int, default=1)
+    parser.add_argument("--default-keys", type=int, default=1000)
+    parser.add_argument("--premium-keys", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.02, help="random +/- seconds around --latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    mock = MockAuthGuard(args.service_id, args.default_keys, args.premium_keys, args.latency, args.jitter,
+                         args.error_rate, args.throttle_rate, args.retry_after, args.seed)
+    web.run_app(mock.create_app(), host=args.host, port=args.port)